@@ -3,19 +3,58 @@ from flask_cors import CORS
 from controllers.user_controller import user_bp
 from controllers.item_controller import item_bp
 from controllers.admin_controller import admin_bp
+from controllers.image_controller import image_bp
+from models import indexes, rollup_model
+from utils import passwords, metrics, images, broker, featured, rate_limit
+from utils.scheduler import Scheduler
+from models.lifecycle_model import lifecycle_jobs
+from utils.json_provider import BSONJSONProvider
 from config import Config
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    # ObjectId-aware JSON for every response
+    app.json = BSONJSONProvider(app)
+    
+    # Request timing and MongoDB command metrics, before anything touches the database
+    metrics.init_app(app)
+    
+    # Token buckets on write and sign-in routes, and a cap on requests in flight
+    rate_limit.init_app(app)
+    
     # Enable CORS
-    CORS(app)
+    CORS(app, expose_headers=["X-Next-Cursor", "Link"])
     
     # Register blueprints
     app.register_blueprint(user_bp, url_prefix='/api/users')
     app.register_blueprint(item_bp, url_prefix='/api/items')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(image_bp, url_prefix='/api/images')
+    
+    # Create indexes and register `flask check-indexes`
+    indexes.init_app(app)
+    
+    # Register `flask backfill-rollups`
+    rollup_model.init_app(app)
+    
+    # Password hashing runs in a process pool
+    passwords.init_app(app)
+    
+    # Uploaded images, resized in a process pool
+    images.init_app(app)
+    
+    # Live item events for the SSE endpoints
+    broker.init_app(app)
+    
+    # In-memory ranking behind /api/items/featured
+    featured.init_app(app)
+    
+    # Lifecycle jobs in this process (otherwise run `python worker.py`)
+    if app.config['SCHEDULER_IN_PROCESS']:
+        app.extensions['scheduler'] = Scheduler(app, lifecycle_jobs(app.config))
+        app.extensions['scheduler'].start()
     
     # Root route for testing
     @app.route('/')
@@ -33,6 +72,24 @@ def create_app(config_class=Config):
             "message": "The requested resource was not found"
         }), 404
     
+    @app.errorhandler(passwords.PasswordServiceBusy)
+    def password_service_busy(e):
+        response = jsonify({
+            "status": "error",
+            "message": "Too many sign-ins right now, please try again"
+        })
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    
+    @app.errorhandler(broker.BrokerFull)
+    def too_many_subscribers(e):
+        response = jsonify({
+            "status": "error",
+            "message": "Too many live connections, please try again"
+        })
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    
     @app.errorhandler(500)
     def server_error(e):
         return jsonify({
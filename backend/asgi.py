@@ -0,0 +1,276 @@
+import asyncio
+import re
+from urllib.parse import parse_qsl, urlencode
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.http import parse_etags, parse_date, http_date
+from app import create_app
+from config import Config
+from models.db import get_async_db
+from models.item_model import embed_references, apply_user_names
+from models.user_model import user_names_query, names_by_id
+from controllers import item_reads
+from utils.pagination import ITEM_SORT, split_page
+from utils.search import (text_query, rank_documents, score_projection, ranking_projection,
+                          trim_ranked, TEXT_SCORE_SORT)
+from utils.catalog import current_version_async, listing_generation, make_etag, is_not_modified
+from utils.response_cache import listing_cache
+from utils import metrics
+from utils.broker import broker, AsyncSubscription, BrokerFull, SSE_HEADERS, parse_last_event_id
+
+# ASGI serving mode. The read-heavy item routes (browse, search, detail) are
+# served by async views on PyMongo's AsyncMongoClient, so a slow query parks a
+# coroutine instead of a worker thread. Every other route falls through to the
+# regular Flask app. Run with SERVER_MODE=asgi python run.py, or
+#     uvicorn --factory asgi:create_asgi_app
+# The views share request parsing and response assembly with
+# controllers/item_controller.py (controllers/item_reads.py), plus its
+# search ranking, ETag and listing cache helpers; only the I/O is awaited here.
+
+class AsyncRequest:
+    """The parts of an ASGI request the item views need"""
+
+    def __init__(self, scope):
+        self.path = scope['path']
+        self.query_string = scope.get('query_string', b'').decode('latin-1')
+        # Keep blank values so ?category= reads as "" like Flask's request.args, not as missing
+        self.args = dict(parse_qsl(self.query_string, keep_blank_values=True))
+        self.headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope['headers']}
+        self.full_path = f"{self.path}?{self.query_string}"
+
+class AsyncItemViews:
+    """Async versions of the item_bp read routes; each returns (status, body, headers)"""
+
+    def __init__(self, flask_app):
+        self.config = flask_app.config
+        self.dumps = flask_app.json.dumps
+        self.db = None
+
+    def _db(self):
+        # Resolved on first request, inside the server's event loop
+        if self.db is None:
+            self.db = get_async_db()
+        return self.db
+
+    def error(self, status, message):
+        return status, self.dumps({"error": message}), {}
+
+    def page(self, request, body, next_cursor, limit):
+        headers = {}
+        if next_cursor:
+            args = dict(request.args, cursor=next_cursor, limit=limit)
+            headers['X-Next-Cursor'] = next_cursor
+            headers['Link'] = f'<{request.path}?{urlencode(args)}>; rel="next"'
+        return 200, body, headers
+
+    async def _cached(self, method, *args):
+        # A shared (Redis) listing cache would block the event loop
+        if listing_cache.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def _embed_users(self, items, embeds):
+        """item_model.embed_users over the async database"""
+        query = user_names_query(embed_references(items, embeds)) if embeds else None
+        if query:
+            names = names_by_id(await self._db().users.find(*query).to_list())
+            apply_user_names(items, embeds, names)
+        return items
+
+    async def get_items(self, request):
+        """Get one page of available items, newest first"""
+        try:
+            plan = item_reads.listing_plan(request.args, self.config)
+        except ValueError as e:
+            return self.error(400, item_reads.error_message(e))
+
+        generation = listing_generation(request.catalog_listings, request.args.get('category'), plan["embeds"])
+        cache_key = listing_cache.key(generation, *plan["cache_key"])
+        cached = await self._cached(listing_cache.get, cache_key)
+        if cached:
+            body, next_cursor = cached
+            return self.page(request, body, next_cursor, plan["limit"])
+
+        docs = await (self._db().items.find(plan["query"], plan["projection"])
+                      .sort(ITEM_SORT).limit(plan["limit"] + 1).to_list())
+        items, next_cursor = split_page(docs, plan["limit"])
+        await self._embed_users(items, plan["embeds"])
+        body = self.dumps(items)
+        await self._cached(listing_cache.set, cache_key, body, next_cursor)
+        return self.page(request, body, next_cursor, plan["limit"])
+
+    async def search(self, request):
+        """Search available items by title and description, best match first"""
+        try:
+            plan = item_reads.search_plan(request.args, self.config)
+        except ValueError as e:
+            return self.error(400, item_reads.error_message(e))
+
+        items = []
+        if plan["limit"]:
+            # utils.search.search_items, awaited
+            text, query, projection = plan["text"], plan["query"], plan["projection"]
+            try:
+                items = await (self._db().items.find(text_query(query, text), score_projection(projection))
+                               .sort(TEXT_SCORE_SORT).skip(plan["offset"]).limit(plan["limit"] + 1).to_list())
+            except NotImplementedError:
+                docs = await self._db().items.find(query, ranking_projection(projection)).to_list()
+                items = trim_ranked(rank_documents(docs, text, plan["offset"], plan["limit"] + 1), projection)
+        items, next_cursor = item_reads.search_page(items, plan)
+        await self._embed_users(items, plan["embeds"])
+        return self.page(request, self.dumps(items), next_cursor, plan["limit"])
+
+    async def get_item(self, request, item_id):
+        """Get a specific item by ID"""
+        try:
+            plan = item_reads.detail_plan(request.args, item_id)
+        except ValueError as e:
+            return self.error(400, item_reads.error_message(e))
+        item = await self._db().items.find_one({"_id": plan["_id"]}, plan["projection"])
+        if not item:
+            return self.error(404, "Item not found")
+        await self._embed_users([item], plan["embeds"])
+        return 200, self.dumps(item), {}
+
+class ItemsASGI:
+    """ASGI app: async item read routes, everything else handed to Flask"""
+
+    ROUTES = [
+        (re.compile(r"^/api/items/?$"), "get_items"),
+        (re.compile(r"^/api/items/search$"), "search"),
+        # Other item_bp routes (my-items needs the Flask session) stay on the WSGI side
+        (re.compile(r"^/api/items/(?!(?:my-items|nearby|events|featured|batch)$)(?P<item_id>[^/]+)$"), "get_item")
+    ]
+    EVENTS_PATH = re.compile(r"^/api/items/events$")
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.views = AsyncItemViews(flask_app)
+        self.fallback = WsgiToAsgi(flask_app)
+
+    def match(self, scope):
+        if scope['type'] != 'http' or scope['method'] != 'GET':
+            return None, {}
+        for pattern, name in self.ROUTES:
+            found = pattern.match(scope['path'])
+            if found:
+                return getattr(self.views, name), found.groupdict()
+        return None, {}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] == 'http' and self.EVENTS_PATH.match(scope['path']):
+            # An idle SSE client here is a parked coroutine, not a worker thread
+            await self._events(AsyncRequest(scope), receive, send)
+            return
+        view, kwargs = self.match(scope)
+        if view is None:
+            await self.fallback(scope, receive, send)
+            return
+
+        request = AsyncRequest(scope)
+        tracked = metrics.begin_request(f"items.{view.__name__}")
+        try:
+            status = await self._respond(send, request, view, kwargs)
+            metrics.record_request_metrics(tracked, 'GET', status)
+        finally:
+            metrics.end_request(tracked)
+
+    async def _respond(self, send, request, view, kwargs):
+        version, updated_at, listings = await current_version_async(
+            get_async_db(), self.flask_app.config['CATALOG_VERSION_MAX_AGE'])
+        etag = make_etag(version, request.full_path)
+        request.catalog_listings = listings
+        if_none_match = request.headers.get('if-none-match')
+        if_modified_since = request.headers.get('if-modified-since')
+        if is_not_modified(etag, updated_at,
+                           parse_etags(if_none_match) if if_none_match else None,
+                           parse_date(if_modified_since) if if_modified_since else None):
+            status, body, headers = 304, '', {}
+        else:
+            status, body, headers = await view(request, **kwargs)
+
+        if status in (200, 304):
+            headers.update({
+                'ETag': f'W/"{etag}"',
+                'Last-Modified': http_date(updated_at),
+                'Cache-Control': 'no-cache'
+            })
+        await self._send(send, request, status, body, headers)
+        return status
+
+    async def _send(self, send, request, status, body, headers):
+        body = (body + "\n").encode() if body else b''
+        headers = dict(headers)
+        if status != 304:
+            headers['Content-Type'] = 'application/json'
+        headers['Content-Length'] = str(len(body))
+        # Same CORS behaviour as flask_cors on the rest of the API
+        origin = request.headers.get('origin')
+        if origin:
+            headers['Access-Control-Allow-Origin'] = origin
+            headers['Access-Control-Expose-Headers'] = 'X-Next-Cursor, Link'
+            headers['Vary'] = 'Origin'
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers.items()]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _events(self, request, receive, send):
+        """GET /api/items/events as an async Server-Sent Events stream"""
+        subscription = AsyncSubscription(broker.queue_size, False, asyncio.get_running_loop())
+        try:
+            broker.subscribe(subscription, parse_last_event_id(request.headers.get('last-event-id')))
+        except BrokerFull:
+            await self._send(send, request, 503, self.views.dumps({"error": "Too many live connections"}),
+                             {'Retry-After': '5'})
+            return
+
+        async def watch_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            subscription.close()
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        keepalive = self.flask_app.config['EVENTS_KEEPALIVE_SECONDS']
+        headers = dict(SSE_HEADERS, **{'Content-Type': 'text/event-stream'})
+        origin = request.headers.get('origin')
+        if origin:
+            headers['Access-Control-Allow-Origin'] = origin
+            headers['Vary'] = 'Origin'
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers.items()]
+            })
+            await send({"type": "http.response.body", "body": b"retry: 2000\n\n", "more_body": True})
+            while not subscription.closed:
+                pending = await subscription.get(keepalive)
+                chunk = "".join(event.encode() for event in pending) if pending else ": keepalive\n\n"
+                await send({"type": "http.response.body", "body": chunk.encode(), "more_body": True})
+            if not watcher.done():
+                # Evicted as a slow consumer; the client reconnects with Last-Event-ID
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            watcher.cancel()
+            broker.unsubscribe(subscription)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({"type": "lifespan.startup.complete"})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+def create_asgi_app(config_class=Config):
+    """ASGI entry point; with ASGI_ASYNC_ITEM_ROUTES off, the whole app runs through WSGI"""
+    flask_app = create_app(config_class)
+    if flask_app.config['ASGI_ASYNC_ITEM_ROUTES']:
+        return ItemsASGI(flask_app)
+    return WsgiToAsgi(flask_app)
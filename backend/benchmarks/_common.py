@@ -0,0 +1,75 @@
+"""Shared helpers for the benchmark scripts in this folder.
+
+Benchmarks run against a real MongoDB, never the development database:
+set BENCH_MONGODB_URI (defaults to a local necessities_swap_bench database).
+Run them from the backend folder, e.g. `python benchmarks/bench_item_pagination.py`.
+"""
+import os
+import sys
+import time
+import statistics
+
+BENCH_MONGODB_URI = os.environ.get('BENCH_MONGODB_URI', 'mongodb://localhost:27017/necessities_swap_bench')
+
+# Models read Config.MONGODB_URI at import time, so point it at the bench database first
+os.environ['MONGODB_URI'] = BENCH_MONGODB_URI
+# Every bench client comes from 127.0.0.1, so leave rate limiting off unless a benchmark turns it on
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ADMIN_EMAIL = "bench-admin@example.edu"
+ADMIN_PASSWORD = "bench-admin"
+
+def admin_client(app):
+    """A test client logged in as the bench admin (created on first use)"""
+    from datetime import datetime
+    from werkzeug.security import generate_password_hash
+    from models.user_model import users_collection
+
+    users_collection.update_one(
+        {"email": ADMIN_EMAIL},
+        {"$set": {"email": ADMIN_EMAIL, "password": generate_password_hash(ADMIN_PASSWORD),
+                  "name": "Bench Admin", "role": "admin", "active": True,
+                  "created_at": datetime.utcnow()}},
+        upsert=True
+    )
+    client = app.test_client()
+    client.post("/api/admin/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+    return client
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def summarize(samples_ms):
+    """Summary statistics for a list of latencies in milliseconds"""
+    return {
+        "count": len(samples_ms),
+        "mean_ms": round(statistics.mean(samples_ms), 3) if samples_ms else 0.0,
+        "p50_ms": round(percentile(samples_ms, 50), 3),
+        "p95_ms": round(percentile(samples_ms, 95), 3),
+        "p99_ms": round(percentile(samples_ms, 99), 3),
+    }
+
+def time_call(fn, *args, **kwargs):
+    """Run fn once; returns (elapsed milliseconds, result)"""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000, result
+
+def parse_sizes(value):
+    """Parse sizes like '1k,10k,1m' into integers"""
+    sizes = []
+    for part in value.split(','):
+        part = part.strip().lower()
+        multiplier = 1
+        if part.endswith('k'):
+            multiplier, part = 1000, part[:-1]
+        elif part.endswith('m'):
+            multiplier, part = 1000000, part[:-1]
+        sizes.append(int(float(part) * multiplier))
+    return sizes
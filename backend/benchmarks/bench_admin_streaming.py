@@ -0,0 +1,102 @@
+"""Peak memory and time to first byte of GET /api/admin/items, buffered vs streamed.
+
+Seeds N items (default 500k) and compares:
+  buffered    the previous implementation: list(find()) + jsonify in one go
+  json_array  the streamed JSON array response (default Accept)
+  ndjson      the streamed NDJSON response (Accept: application/x-ndjson)
+Peak memory is measured with tracemalloc while the whole body is consumed.
+
+    python benchmarks/bench_admin_streaming.py --items 500000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import datetime
+
+import _common  # points MONGODB_URI at the bench database before the app imports
+from _common import admin_client
+from flask import jsonify
+
+from app import create_app
+from models.item_model import items_collection
+
+def seed_items(total, batch_size=10000):
+    """Grow the bench items collection to exactly `total` items"""
+    existing = items_collection.count_documents({})
+    if existing > total:
+        items_collection.delete_many({})
+        existing = 0
+    while existing < total:
+        count = min(batch_size, total - existing)
+        items_collection.insert_many([{
+            "title": f"Item {existing + i}",
+            "description": "Seeded for the admin streaming benchmark " * 4,
+            "category": "books",
+            "user_id": "bench",
+            "status": "pending",
+            "created_at": datetime.utcnow()
+        } for i in range(count)], ordered=False)
+        existing += count
+
+def measure(fn):
+    """Run fn under tracemalloc; returns peak MiB, total seconds, first-byte seconds, bytes"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    first_byte, size = fn(start)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "peak_mib": round(peak / 2 ** 20, 2),
+        "total_s": round(elapsed, 3),
+        "first_byte_s": round(first_byte, 3),
+        "bytes": size
+    }
+
+def buffered(app):
+    def run(start):
+        with app.test_request_context():
+            items = list(items_collection.find({}))
+            for item in items:
+                item['_id'] = str(item['_id'])
+            body = jsonify(items).get_data()
+        return time.perf_counter() - start, len(body)
+    return run
+
+def streamed(client, accept, batch_size):
+    def run(start):
+        response = client.get(f"/api/admin/items?batch_size={batch_size}",
+                              headers={"Accept": accept}, buffered=False)
+        first_byte, size = None, 0
+        for chunk in response.response:
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            size += len(chunk)
+        response.close()
+        return first_byte, size
+    return run
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=500000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    app = create_app()
+    seed_items(args.items)
+    client = admin_client(app)
+    results = {
+        "items": args.items,
+        "buffered": measure(buffered(app)),
+        "json_array": measure(streamed(client, "application/json", args.batch_size)),
+        "ndjson": measure(streamed(client, "application/x-ndjson", args.batch_size))
+    }
+    for mode in ("buffered", "json_array", "ndjson"):
+        r = results[mode]
+        print(f"{mode:>10}  peak {r['peak_mib']:9.2f} MiB  first byte {r['first_byte_s']:7.3f} s  "
+              f"total {r['total_s']:7.3f} s  {r['bytes']} bytes")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,124 @@
+"""Requests/sec and latency of the item read routes: WSGI path vs ASGI mode.
+
+Starts each server in a subprocess on the bench database:
+  wsgi  the current path, run.py's threaded Werkzeug server
+  asgi  uvicorn with the async item routes (asgi.create_asgi_app)
+then drives GET /api/items/ and /api/items/<id> from many concurrent
+connections. The listing cache is disabled so every request reaches MongoDB.
+
+    python benchmarks/bench_asgi.py --concurrency 256 --seconds 15
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import _common  # points MONGODB_URI at the bench database before the app imports
+from _common import summarize, BENCH_MONGODB_URI
+
+from models.item_model import items_collection
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    "wsgi": "from werkzeug.serving import run_simple; from app import create_app; "
+            "run_simple('127.0.0.1', {port}, create_app(), threaded=True)",
+    "asgi": "import uvicorn; uvicorn.run('asgi:create_asgi_app', factory=True, "
+            "host='127.0.0.1', port={port}, log_level='warning')"
+}
+
+def seed(count):
+    """Make sure there are `count` approved items; returns a few of their ids"""
+    missing = count - items_collection.count_documents({"status": "approved"})
+    if missing > 0:
+        items_collection.insert_many([{
+            "title": f"Item {i}", "description": "Seeded for the ASGI benchmark",
+            "category": "books", "user_id": "bench", "status": "approved",
+            "created_at": datetime.utcnow()
+        } for i in range(missing)])
+    return [str(d['_id']) for d in items_collection.find({"status": "approved"}, {"_id": 1}).limit(50)]
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def start_server(mode, port):
+    env = dict(os.environ, MONGODB_URI=BENCH_MONGODB_URI, MONGODB_ENSURE_INDEXES='false',
+               RESPONSE_CACHE_MAX_ENTRIES='0', CATALOG_VERSION_MAX_AGE='3600')
+    proc = subprocess.Popen([sys.executable, '-c', SERVERS[mode].format(port=port)],
+                            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 20
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"{mode} server did not start")
+
+async def fetch(port, path):
+    """One GET over a fresh connection; returns the status code"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b' ', 2)[1])
+
+async def load(port, paths, concurrency, seconds):
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+
+    async def client(n):
+        nonlocal errors
+        i = n
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                status = await fetch(port, paths[i % len(paths)])
+            except OSError:
+                status = None
+            if status == 200:
+                latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                errors += 1
+            i += 1
+
+    await asyncio.gather(*(client(n) for n in range(concurrency)))
+    return latencies, errors
+
+def run(mode, paths, concurrency, seconds):
+    port = free_port()
+    proc = start_server(mode, port)
+    try:
+        asyncio.run(load(port, paths, min(concurrency, 8), 2))  # warm up
+        latencies, errors = asyncio.run(load(port, paths, concurrency, seconds))
+    finally:
+        proc.terminate()
+        proc.wait()
+    return dict(summarize(latencies), requests_per_sec=round(len(latencies) / seconds, 1), errors=errors)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, default=256)
+    parser.add_argument('--seconds', type=float, default=15)
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    item_ids = seed(args.items)
+    paths = ["/api/items/?limit=24", "/api/items/?limit=24&category=books"] + [f"/api/items/{i}" for i in item_ids]
+    results = {mode: run(mode, paths, args.concurrency, args.seconds) for mode in SERVERS}
+    for mode, r in results.items():
+        print(f"{mode:>5}  {r['requests_per_sec']:8.1f} req/s  p50 {r['p50_ms']:8.2f} ms  "
+              f"p99 {r['p99_ms']:8.2f} ms  errors {r['errors']}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
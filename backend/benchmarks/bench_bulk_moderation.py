@@ -0,0 +1,63 @@
+"""Moderating N pending items: one request per item vs one bulk request.
+
+    python benchmarks/bench_bulk_moderation.py --items 500
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+
+import _common  # points MONGODB_URI at the bench database before the app imports
+from _common import admin_client
+
+from app import create_app
+from models.item_model import items_collection
+
+def seed(count):
+    """Fresh pending items; returns their ids as strings"""
+    result = items_collection.insert_many([{
+        "title": f"Pending item {i}",
+        "description": "Seeded for the bulk moderation benchmark",
+        "category": "kitchen",
+        "user_id": "bench",
+        "status": "pending",
+        "created_at": datetime.utcnow()
+    } for i in range(count)])
+    return [str(_id) for _id in result.inserted_ids]
+
+def one_at_a_time(client, item_ids):
+    start = time.perf_counter()
+    for item_id in item_ids:
+        client.post(f"/api/admin/items/{item_id}/moderate", json={"action": "approved"})
+    return time.perf_counter() - start
+
+def bulk(client, item_ids):
+    start = time.perf_counter()
+    response = client.post("/api/admin/items/moderate", json={
+        "items": [{"id": item_id, "action": "approved"} for item_id in item_ids]
+    })
+    elapsed = time.perf_counter() - start
+    assert response.get_json()["updated"] == len(item_ids), response.get_json()
+    return elapsed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=500)
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    app = create_app()
+    client = admin_client(app)
+    loop_s = one_at_a_time(client, seed(args.items))
+    bulk_s = bulk(client, seed(args.items))
+    results = {
+        "items": args.items,
+        "one_at_a_time_s": round(loop_s, 3),
+        "bulk_s": round(bulk_s, 3),
+        "speedup": round(loop_s / bulk_s, 1) if bulk_s else None
+    }
+    print(f"{args.items} items: one at a time {loop_s:.3f} s, bulk {bulk_s:.3f} s "
+          f"({results['speedup']}x)")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
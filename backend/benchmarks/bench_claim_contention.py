@@ -0,0 +1,111 @@
+"""Concurrent claim race on POST /api/items/<id>/claim.
+
+Seeds a handful of approved items, then has many threads (each a separate
+logged-in student) try to claim them all at once. Every item must end up
+with exactly one successful claim, matching claimed_by in the database.
+Reports claim attempts per second; exits non-zero on a double claim.
+
+    python benchmarks/bench_claim_contention.py --items 5 --threads 64 --rounds 20
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from bson import ObjectId
+
+import _common  # points MONGODB_URI at the bench database before the app imports
+from app import create_app
+from models.item_model import items_collection
+
+def seed(count):
+    """Fresh approved items to fight over; returns their ids as strings"""
+    result = items_collection.insert_many([{
+        "title": f"Contended item {i}",
+        "description": "Seeded for the claim contention benchmark",
+        "category": "furniture",
+        "user_id": "bench",
+        "status": "approved",
+        "created_at": datetime.utcnow()
+    } for i in range(count)])
+    return [str(_id) for _id in result.inserted_ids]
+
+def student_client(app):
+    """A test client whose session belongs to a new random user"""
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = str(ObjectId())
+    return client
+
+def race(app, item_ids, threads):
+    """All threads claim every item at once; returns (wins, winners, attempts, seconds)"""
+    clients = [student_client(app) for _ in range(threads)]
+    barrier = threading.Barrier(threads)
+    wins = Counter()
+    winners = {}
+    lock = threading.Lock()
+
+    def worker(client):
+        with client.session_transaction() as sess:
+            user_id = sess['user_id']
+        barrier.wait()
+        for item_id in item_ids:
+            if client.post(f"/api/items/{item_id}/claim").status_code == 200:
+                with lock:
+                    wins[item_id] += 1
+                    winners[item_id] = user_id
+
+    workers = [threading.Thread(target=worker, args=(c,)) for c in clients]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return wins, winners, threads * len(item_ids), time.perf_counter() - start
+
+def check(item_ids, wins, winners):
+    """Problems found: items with zero or several winners, or a mismatched claimed_by"""
+    problems = []
+    stored = {str(d['_id']): d for d in items_collection.find({"_id": {"$in": [ObjectId(i) for i in item_ids]}})}
+    for item_id in item_ids:
+        if wins[item_id] != 1:
+            problems.append(f"{item_id}: {wins[item_id]} successful claims")
+        elif stored[item_id].get('claimed_by') != winners[item_id]:
+            problems.append(f"{item_id}: claimed_by does not match the winning response")
+    return problems
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=5)
+    parser.add_argument('--threads', type=int, default=64)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    app = create_app()
+    attempts_total, seconds_total, problems = 0, 0.0, []
+    for _ in range(args.rounds):
+        item_ids = seed(args.items)
+        wins, winners, attempts, seconds = race(app, item_ids, args.threads)
+        problems.extend(check(item_ids, wins, winners))
+        attempts_total += attempts
+        seconds_total += seconds
+    results = {
+        "items_per_round": args.items,
+        "threads": args.threads,
+        "rounds": args.rounds,
+        "attempts": attempts_total,
+        "claims_per_sec": round(attempts_total / seconds_total, 1),
+        "double_or_missing_claims": len(problems)
+    }
+    print(f"{attempts_total} claim attempts at {results['claims_per_sec']} claims/sec, "
+          f"{len(problems)} items without exactly one winner")
+    for problem in problems:
+        print("  " + problem)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if problems else 0)
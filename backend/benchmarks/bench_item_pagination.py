@@ -0,0 +1,92 @@
+"""Per-page latency of GET /api/items as the catalog grows.
+
+Seeds the bench database with N approved items for each size and times the
+first page and a page deep into the catalog (reached by following cursors).
+With keyset pagination both should stay flat from 1k to 1M items.
+
+    python benchmarks/bench_item_pagination.py --sizes 1k,10k,100k,1m
+"""
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+
+import _common  # points MONGODB_URI at the bench database before the app imports
+from _common import summarize, time_call, parse_sizes
+
+from app import create_app
+from models.item_model import items_collection
+from models.indexes import ensure_indexes
+
+CATEGORIES = ["bedding", "kitchen", "books", "electronics", "clothing", "furniture"]
+
+def seed(total, batch_size=10000):
+    """Grow the bench items collection to exactly `total` approved items"""
+    existing = items_collection.count_documents({})
+    if existing > total:
+        items_collection.delete_many({})
+        existing = 0
+    start = datetime.utcnow() - timedelta(days=365)
+    while existing < total:
+        batch = []
+        for i in range(existing, min(total, existing + batch_size)):
+            batch.append({
+                "title": f"Item {i}",
+                "description": "Seeded for pagination benchmark",
+                "category": random.choice(CATEGORIES),
+                "user_id": "bench",
+                "status": "approved",
+                "created_at": start + timedelta(seconds=i)
+            })
+        items_collection.insert_many(batch, ordered=False)
+        existing += len(batch)
+    ensure_indexes()
+
+def run(client, sizes, pages, depth, limit):
+    results = []
+    for size in sizes:
+        seed(size)
+        first, deep, category = [], [], []
+        for _ in range(pages):
+            ms, resp = time_call(client.get, f"/api/items/?limit={limit}")
+            first.append(ms)
+            ms, _ = time_call(client.get, f"/api/items/?limit={limit}&category=books")
+            category.append(ms)
+        # Walk `depth` pages in, then time the following pages
+        cursor = resp.headers.get('X-Next-Cursor')
+        for _ in range(depth):
+            if not cursor:
+                break
+            cursor = client.get(f"/api/items/?limit={limit}&cursor={cursor}").headers.get('X-Next-Cursor')
+        for _ in range(pages):
+            if not cursor:
+                break
+            ms, resp = time_call(client.get, f"/api/items/?limit={limit}&cursor={cursor}")
+            deep.append(ms)
+            cursor = resp.headers.get('X-Next-Cursor')
+        row = {
+            "items": size,
+            "first_page": summarize(first),
+            "category_page": summarize(category),
+            "deep_page": summarize(deep)
+        }
+        results.append(row)
+        print(f"{size:>9} items  first p50 {row['first_page']['p50_ms']:7.2f} ms  "
+              f"category p50 {row['category_page']['p50_ms']:7.2f} ms  "
+              f"deep p50 {row['deep_page']['p50_ms']:7.2f} ms")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1k,10k,100k,1m')
+    parser.add_argument('--pages', type=int, default=50, help="timed pages per size")
+    parser.add_argument('--depth', type=int, default=100, help="pages to skip before timing deep pages")
+    parser.add_argument('--limit', type=int, default=24)
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    app = create_app()
+    results = run(app.test_client(), sorted(parse_sizes(args.sizes)), args.pages, args.depth, args.limit)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
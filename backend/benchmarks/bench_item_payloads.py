@@ -0,0 +1,99 @@
+"""Bytes and CPU per item listing response, whole documents vs projections.
+
+Seeds approved items with realistically long descriptions plus claim and
+reservation fields, then compares the old listing path (every field, the
+`_id` rewrite loop and Flask's key-sorting encoder) with GET /api/items in
+its default card view and with an explicit ?fields= list. CPU is process
+time, so it includes encoding but not time spent waiting on MongoDB.
+
+    python benchmarks/bench_item_payloads.py --items 5000 --limit 100
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from flask.json.provider import DefaultJSONProvider
+
+import _common  # points MONGODB_URI at the bench database before the app imports
+from _common import summarize, time_call
+
+from app import create_app
+from models.item_model import items_collection
+from models.indexes import ensure_indexes
+from utils.pagination import ITEM_SORT
+from utils.response_cache import listing_cache
+
+CATEGORIES = ["bedding", "kitchen", "books", "electronics", "clothing", "furniture"]
+WORDS = "gently used works fine pick up near campus clean no stains includes cable box".split()
+
+def seed(total):
+    items_collection.delete_many({})
+    start = datetime.utcnow() - timedelta(days=30)
+    items_collection.insert_many([{
+        "title": f"Item {i}",
+        "description": " ".join(random.choices(WORDS, k=120)),
+        "category": random.choice(CATEGORIES),
+        "image_url": f"https://example.edu/images/{i}.jpg",
+        "user_id": f"user-{i % 500}",
+        "status": "approved",
+        "created_at": start + timedelta(seconds=i),
+        "reserved_by": f"user-{(i + 1) % 500}",
+        "reserved_until": start + timedelta(days=31)
+    } for i in range(total)], ordered=False)
+    ensure_indexes()
+
+def old_listing(app, limit):
+    """The listing path before projections and the ObjectId-aware provider"""
+    encoder = DefaultJSONProvider(app)
+    def call():
+        items = list(items_collection.find({"status": "approved"}).sort(ITEM_SORT).limit(limit + 1))[:limit]
+        for item in items:
+            item['_id'] = str(item['_id'])
+        return encoder.dumps(items).encode()
+    return call
+
+def endpoint(client, url):
+    def call():
+        return client.get(url).get_data()
+    return call
+
+def measure(name, call, runs):
+    latencies, cpu, size = [], [], 0
+    for _ in range(runs):
+        cpu_start = time.process_time()
+        ms, body = time_call(call)
+        cpu.append((time.process_time() - cpu_start) * 1000)
+        latencies.append(ms)
+        size = len(body)
+    row = {"variant": name, "bytes": size, "latency": summarize(latencies), "cpu": summarize(cpu)}
+    print(f"{name:<34} {size:>9} bytes  p50 {row['latency']['p50_ms']:7.2f} ms  "
+          f"cpu p50 {row['cpu']['p50_ms']:7.2f} ms")
+    return row
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=5000)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    app = create_app()
+    seed(args.items)
+    client = app.test_client()
+    results = []
+    with app.app_context():
+        results.append(measure("whole documents (before)", old_listing(app, args.limit), args.runs))
+    for name, url in [
+        ("card view (default)", f"/api/items/?limit={args.limit}"),
+        ("?fields=title,category", f"/api/items/?limit={args.limit}&fields=title,category"),
+    ]:
+        def uncached(call=endpoint(client, url)):
+            # Measure encoding and Mongo, not the listing cache
+            listing_cache.backend.entries.clear()
+            return call()
+        results.append(measure(name, uncached, args.runs))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,103 @@
+"""Login throughput and concurrent browse latency, hashing inline vs in the process pool.
+
+For each mode, login threads hammer POST /api/users/login while browse
+threads time GET /api/items. With inline hashing the CPU-heavy hash holds
+the GIL and browse p99 climbs; with the pool it should stay close to idle.
+
+    python benchmarks/bench_login_throughput.py --seconds 10 --login-threads 16 --browse-threads 4
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import _common  # points MONGODB_URI at the bench database before the app imports
+from _common import summarize, time_call
+from werkzeug.security import generate_password_hash
+
+from app import create_app
+from config import Config
+from models.user_model import users_collection
+
+PASSWORD = "correct horse battery staple"
+
+def seed_users(count, method):
+    """Bench students sharing one password; returns their emails"""
+    password_hash = generate_password_hash(PASSWORD, method)
+    emails = [f"bench-login-{i}@example.edu" for i in range(count)]
+    for email in emails:
+        users_collection.update_one({"email": email}, {"$set": {
+            "email": email, "password": password_hash, "name": "Bench Student",
+            "role": "user", "active": True, "created_at": datetime.utcnow()
+        }}, upsert=True)
+    return emails
+
+def run_mode(workers, emails, seconds, login_threads, browse_threads):
+    config = type("BenchConfig", (Config,), {"PASSWORD_HASH_WORKERS": workers})
+    app = create_app(config)
+    stop = threading.Event()
+    logins, rejected, browse_ms = [0], [0], []
+    lock = threading.Lock()
+
+    def login_worker(index):
+        client = app.test_client()
+        email = emails[index % len(emails)]
+        while not stop.is_set():
+            status = client.post("/api/users/login", json={"email": email, "password": PASSWORD}).status_code
+            with lock:
+                if status == 200:
+                    logins[0] += 1
+                elif status == 503:
+                    rejected[0] += 1
+
+    def browse_worker():
+        client = app.test_client()
+        while not stop.is_set():
+            ms, _ = time_call(client.get, "/api/items/?limit=24")
+            with lock:
+                browse_ms.append(ms)
+
+    # Browse latency with no login load, for reference
+    idle_client = app.test_client()
+    idle = [time_call(idle_client.get, "/api/items/?limit=24")[0] for _ in range(200)]
+
+    threads = [threading.Thread(target=login_worker, args=(i,)) for i in range(login_threads)]
+    threads += [threading.Thread(target=browse_worker) for _ in range(browse_threads)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return {
+        "hash_workers": workers,
+        "logins_per_sec": round(logins[0] / seconds, 1),
+        "rejected_busy": rejected[0],
+        "browse_idle": summarize(idle),
+        "browse_under_login_load": summarize(browse_ms)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--login-threads', type=int, default=16)
+    parser.add_argument('--browse-threads', type=int, default=4)
+    parser.add_argument('--pool-workers', type=int, default=None, help="defaults to one per CPU")
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    emails = seed_users(args.login_threads, Config.PASSWORD_HASH_METHOD)
+    pool_workers = args.pool_workers or os.cpu_count()
+    results = [run_mode(workers, emails, args.seconds, args.login_threads, args.browse_threads)
+               for workers in (0, pool_workers)]
+    for r in results:
+        mode = "inline" if not r["hash_workers"] else f"pool({r['hash_workers']})"
+        print(f"{mode:>10}  {r['logins_per_sec']:7.1f} logins/s  {r['rejected_busy']} busy  "
+              f"browse p50 {r['browse_under_login_load']['p50_ms']:7.2f} ms  "
+              f"p99 {r['browse_under_login_load']['p99_ms']:7.2f} ms  "
+              f"(idle p99 {r['browse_idle']['p99_ms']:.2f} ms)")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,96 @@
+"""Cost of GET /api/items/nearby as the catalog grows.
+
+Seeds the bench database with N approved items scattered over a 5 km
+square around campus and times the first nearby page (1 km radius) for
+each size. Alongside latency it reports the documents and index keys the
+$geoNear stage examined, which should grow far slower than N because the
+2dsphere index only visits cells near the point.
+
+    python benchmarks/bench_nearby.py --sizes 1k,10k,100k,1m
+"""
+import argparse
+import json
+import math
+import random
+from datetime import datetime, timedelta
+
+import _common  # points MONGODB_URI at the bench database before the app imports
+from _common import summarize, time_call, parse_sizes
+
+from app import create_app
+from models.item_model import items_collection
+from models.indexes import ensure_indexes
+
+CATEGORIES = ["bedding", "kitchen", "books", "electronics", "clothing", "furniture"]
+CAMPUS = (40.0, -75.0)  # lat, lng
+# Degrees of latitude per meter; longitude is scaled by cos(lat)
+DEGREES_PER_METER = 1 / 111320
+
+def random_point(rng, half_width=2500):
+    lat = CAMPUS[0] + rng.uniform(-half_width, half_width) * DEGREES_PER_METER
+    lng = CAMPUS[1] + rng.uniform(-half_width, half_width) * DEGREES_PER_METER / math.cos(math.radians(CAMPUS[0]))
+    return {"type": "Point", "coordinates": [lng, lat]}
+
+def seed(total, batch_size=10000):
+    """Grow the bench items collection to exactly `total` approved items with locations"""
+    rng = random.Random(total)
+    existing = items_collection.count_documents({})
+    if existing > total:
+        items_collection.delete_many({})
+        existing = 0
+    start = datetime.utcnow() - timedelta(days=365)
+    while existing < total:
+        batch = []
+        for i in range(existing, min(total, existing + batch_size)):
+            batch.append({
+                "title": f"Item {i}",
+                "description": "Seeded for nearby benchmark",
+                "category": rng.choice(CATEGORIES),
+                "user_id": "bench",
+                "status": "approved",
+                "created_at": start + timedelta(seconds=i),
+                "location": random_point(rng)
+            })
+        items_collection.insert_many(batch, ordered=False)
+        existing += len(batch)
+    ensure_indexes()
+
+def examined(max_distance):
+    """(docs, keys) the geo query examined, from explain()"""
+    plan = items_collection.find({"status": "approved", "location": {"$nearSphere": {
+        "$geometry": {"type": "Point", "coordinates": [CAMPUS[1], CAMPUS[0]]},
+        "$maxDistance": max_distance}}}).limit(24).explain()
+    stats = plan.get('executionStats', {})
+    return stats.get('totalDocsExamined'), stats.get('totalKeysExamined')
+
+def run(client, sizes, requests, max_distance, limit):
+    results = []
+    url = f"/api/items/nearby?lat={CAMPUS[0]}&lng={CAMPUS[1]}&max_distance={max_distance}&limit={limit}"
+    for size in sizes:
+        seed(size)
+        samples = []
+        for _ in range(requests):
+            ms, resp = time_call(client.get, url)
+            assert resp.status_code == 200, resp.get_data(as_text=True)
+            samples.append(ms)
+        docs, keys = examined(max_distance)
+        row = {"items": size, "nearby": summarize(samples), "docs_examined": docs, "keys_examined": keys}
+        results.append(row)
+        print(f"{size:>9} items  p50 {row['nearby']['p50_ms']:7.2f} ms  p99 {row['nearby']['p99_ms']:7.2f} ms  "
+              f"docs examined {docs}  keys examined {keys}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1k,10k,100k,1m')
+    parser.add_argument('--requests', type=int, default=100, help="timed requests per size")
+    parser.add_argument('--max-distance', type=float, default=1000, help="search radius in meters")
+    parser.add_argument('--limit', type=int, default=24)
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    app = create_app()
+    results = run(app.test_client(), sorted(parse_sizes(args.sizes)), args.requests, args.max_distance, args.limit)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,146 @@
+"""Browse latency under an abusive write burst, with and without rate limiting.
+
+Browse threads time GET /api/items while burst threads, all one signed-in
+student from one IP, hammer POST /api/items, POST /api/items/<id>/claim and
+POST /api/users/login with a wrong password. Without limits every burst
+request does its full database (and hashing) work and browse p99 climbs;
+with them the burst is answered 429/503 straight away and browse p99 should
+stay close to its idle value. The burst also sends CORS preflights
+(OPTIONS) for those routes, which must never be throttled, and a sign-in
+right after a run of preflights must not be either. Exits non-zero if the
+limited p99 is more than --max-ratio times the idle p99, or if any
+preflight or that sign-in was answered 429/503.
+
+    python benchmarks/bench_rate_limits.py --seconds 10 --burst-threads 32 --browse-threads 4
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import _common  # points MONGODB_URI at the bench database before the app imports
+from _common import summarize, time_call
+from bson import ObjectId
+
+from app import create_app
+from config import Config
+from models.item_model import items_collection
+
+# What a browser sends before a cross-origin JSON POST
+PREFLIGHT_HEADERS = {"Origin": "http://localhost:3000", "Access-Control-Request-Method": "POST",
+                     "Access-Control-Request-Headers": "content-type"}
+THROTTLED = (429, 503)
+
+def preflight(client, path):
+    return client.open(path, method="OPTIONS", headers=PREFLIGHT_HEADERS)
+
+def seed(count):
+    """Approved items to browse and to claim; returns their ids as strings"""
+    result = items_collection.insert_many([{
+        "title": f"Giveaway item {i}",
+        "description": "Seeded for the rate limit benchmark",
+        "category": "kitchen",
+        "user_id": "bench",
+        "status": "approved",
+        "created_at": datetime.utcnow()
+    } for i in range(count)])
+    return [str(_id) for _id in result.inserted_ids]
+
+def run_mode(limited, item_ids, seconds, burst_threads, browse_threads):
+    config = type("BenchConfig", (Config,), {"RATE_LIMIT_ENABLED": limited})
+    app = create_app(config)
+    abuser = str(ObjectId())
+    stop = threading.Event()
+    statuses, preflight_statuses, browse_ms = Counter(), Counter(), []
+    lock = threading.Lock()
+
+    def burst_worker(index):
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = abuser
+        claim_path = f"/api/items/{item_ids[index % len(item_ids)]}/claim"
+        requests = [
+            lambda: client.post("/api/items/", json={"title": "Free mini fridge", "description": "Burst",
+                                                     "category": "kitchen"}),
+            lambda: client.post(claim_path),
+            lambda: client.post("/api/users/login", json={"email": "nobody@example.edu",
+                                                          "password": "wrong"})
+        ]
+        preflights = [lambda path=path: preflight(client, path)
+                      for path in ("/api/items/", claim_path, "/api/users/login")]
+        sent = 0
+        while not stop.is_set():
+            status = requests[sent % len(requests)]().status_code
+            preflight_status = preflights[sent % len(preflights)]().status_code
+            sent += 1
+            with lock:
+                statuses[status] += 1
+                preflight_statuses[preflight_status] += 1
+
+    def browse_worker():
+        client = app.test_client()
+        while not stop.is_set():
+            ms, _ = time_call(client.get, "/api/items/?limit=24")
+            with lock:
+                browse_ms.append(ms)
+
+    # Browse latency with no burst, for reference
+    idle_client = app.test_client()
+    idle = [time_call(idle_client.get, "/api/items/?limit=24")[0] for _ in range(200)]
+
+    # More preflights than the sign-in bucket holds, then the sign-in itself
+    login_client = app.test_client()
+    for _ in range(100):
+        preflight(login_client, "/api/users/login")
+    login_after_preflights = login_client.post("/api/users/login", json={"email": "nobody@example.edu",
+                                                                         "password": "wrong"}).status_code
+
+    threads = [threading.Thread(target=burst_worker, args=(i,)) for i in range(burst_threads)]
+    threads += [threading.Thread(target=browse_worker) for _ in range(browse_threads)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return {
+        "rate_limited": limited,
+        "burst_requests_per_sec": round(sum(statuses.values()) / seconds, 1),
+        "burst_statuses": {str(status): n for status, n in sorted(statuses.items())},
+        "preflight_statuses": {str(status): n for status, n in sorted(preflight_statuses.items())},
+        "login_after_preflights": login_after_preflights,
+        "browse_idle": summarize(idle),
+        "browse_under_burst": summarize(browse_ms)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--burst-threads', type=int, default=32)
+    parser.add_argument('--browse-threads', type=int, default=4)
+    parser.add_argument('--items', type=int, default=200)
+    parser.add_argument('--max-ratio', type=float, default=2.0,
+                        help="fail if limited browse p99 exceeds this multiple of idle p99")
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    results = [run_mode(limited, seed(args.items), args.seconds, args.burst_threads, args.browse_threads)
+               for limited in (False, True)]
+    for r in results:
+        mode = "limited" if r["rate_limited"] else "unlimited"
+        print(f"{mode:>10}  {r['burst_requests_per_sec']:8.1f} burst req/s {r['burst_statuses']}  "
+              f"browse p50 {r['browse_under_burst']['p50_ms']:7.2f} ms  "
+              f"p99 {r['browse_under_burst']['p99_ms']:7.2f} ms  "
+              f"(idle p99 {r['browse_idle']['p99_ms']:.2f} ms)  "
+              f"preflights {r['preflight_statuses']}  sign-in after preflights {r['login_after_preflights']}")
+    limited = results[1]
+    ratio = limited['browse_under_burst']['p99_ms'] / max(limited['browse_idle']['p99_ms'], 0.001)
+    preflights_throttled = (any(int(status) in THROTTLED for status in limited['preflight_statuses'])
+                            or limited['login_after_preflights'] in THROTTLED)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if ratio > args.max_ratio or preflights_throttled else 0)
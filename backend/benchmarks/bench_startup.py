@@ -0,0 +1,77 @@
+"""Time to import the app and build it, with and without a reachable MongoDB.
+
+Each measurement runs in a fresh interpreter with the default config. Against
+an unroutable address the import and create_app() must still return
+immediately, because the MongoClient is only created on first use
+(models/db.py) and indexes are applied from a background thread
+(models/indexes.py); only the first query pays for server selection.
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import _common  # points MONGODB_URI at the bench database before the app imports
+from _common import summarize, BENCH_MONGODB_URI
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child interpreter; prints import, create_app and first-query times in ms
+PROBE = """
+import json, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+application = app.create_app()
+t2 = time.perf_counter()
+first_query = None
+if {query}:
+    from models.db import get_db
+    try:
+        get_db().command('ping')
+        first_query = (time.perf_counter() - t2) * 1000
+    except Exception:
+        first_query = -1
+print(json.dumps({{"import_ms": (t1 - t0) * 1000, "create_app_ms": (t2 - t1) * 1000,
+                  "first_query_ms": first_query}}))
+"""
+
+def probe(uri, query):
+    env = dict(os.environ, MONGODB_URI=uri, MONGODB_SERVER_SELECTION_TIMEOUT_MS='2000')
+    # Measure what a deployment runs, index bootstrap included
+    env.pop('MONGODB_ENSURE_INDEXES', None)
+    out = subprocess.run([sys.executable, '-c', PROBE.format(query=query)], cwd=BACKEND_DIR,
+                         env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def run(runs):
+    scenarios = {
+        # 10.255.255.1 is non-routable: any connect attempt here would hang until timeout
+        "unreachable_server": ("mongodb://10.255.255.1:27017/necessities_swap_bench", False),
+        "reachable_server": (BENCH_MONGODB_URI, True)
+    }
+    results = {}
+    for name, (uri, query) in scenarios.items():
+        samples = [probe(uri, query) for _ in range(runs)]
+        results[name] = {
+            key: summarize([s[key] for s in samples if s[key] is not None])
+            for key in ("import_ms", "create_app_ms", "first_query_ms")
+        }
+        print(f"{name:>20}  import p50 {results[name]['import_ms']['p50_ms']:8.2f} ms  "
+              f"create_app p50 {results[name]['create_app_ms']['p50_ms']:8.2f} ms  "
+              f"first query p50 {results[name]['first_query_ms']['p50_ms']:8.2f} ms")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.runs)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
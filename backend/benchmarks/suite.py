@@ -0,0 +1,379 @@
+"""Load-test and benchmark suite covering every route in user_bp, item_bp, admin_bp and image_bp.
+
+Boots create_app against the bench MongoDB (or an in-memory stand-in with
+--backend mongomock, which needs `pip install mongomock` and skips the geo
+query behind /nearby), seeds users and items, then:
+  1. times each endpoint on its own for --requests calls, and
+  2. drives a weighted, realistic mix from --threads concurrent clients.
+For each endpoint it reports throughput, p50/p95/p99 latency and MongoDB
+round trips per request (counted by a command listener). Results are saved
+as JSON with the git commit so runs can be compared:
+
+    python benchmarks/suite.py --users 1000 --items 50000 --out results/$(git rev-parse --short HEAD).json
+    python benchmarks/suite.py --compare results/abc1234.json --out results/def5678.json
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import random
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import _common  # points MONGODB_URI at the bench database before the app imports
+from _common import summarize, admin_client, BENCH_MONGODB_URI
+from bson import ObjectId
+from pymongo import monitoring
+from werkzeug.security import generate_password_hash
+
+CATEGORIES = ["bedding", "kitchen", "books", "electronics", "clothing", "furniture", "decor", "bath"]
+WORDS = ["lamp", "desk", "mini", "fridge", "textbook", "chemistry", "towel", "mug", "chair",
+         "kettle", "poster", "hanger", "blanket", "pillow", "calculator", "monitor", "rug"]
+STUDENT_PASSWORD = "bench-student"
+CAMPUS = (40.0, -75.0)  # lat, lng
+# Routes the mongomock stand-in can't serve ($geoNear isn't implemented there)
+MONGOMOCK_UNSUPPORTED = {"GET /api/items/nearby"}
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts MongoDB commands sent by this process"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        with self._lock:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+def use_mongomock():
+    """Point the models at an in-memory mongomock client"""
+    import mongomock
+    from mongomock.collection import BulkOperationBuilder
+    from models import db
+
+    # PyMongo 4.9+ passes sort= to bulk updates and replaces, which mongomock
+    # doesn't accept yet; the app never sets it, so drop it when it's None
+    for name in ('add_update', 'add_replace'):
+        original = getattr(BulkOperationBuilder, name)
+        def without_sort(self, *args, _original=original, sort=None, **kwargs):
+            if sort is not None:
+                raise NotImplementedError("mongomock bulk writes don't support sort")
+            return _original(self, *args, **kwargs)
+        setattr(BulkOperationBuilder, name, without_sort)
+    db.set_client(mongomock.MongoClient(BENCH_MONGODB_URI))
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def photo(n):
+    """A JPEG upload; each n gives different bytes, so it is stored rather than deduplicated"""
+    from PIL import Image
+
+    out = io.BytesIO()
+    Image.new("RGB", (1200, 900), (90, 120, 150)).save(out, "JPEG", comment=f"suite upload {n}")
+    return out.getvalue()
+
+def seed(users, items):
+    """Reset the bench collections and fill them; returns the seeded user emails"""
+    from models.user_model import users_collection
+    from models.item_model import items_collection
+
+    rng = random.Random(42)
+    users_collection.delete_many({})
+    items_collection.delete_many({})
+    password_hash = generate_password_hash(STUDENT_PASSWORD)
+    now = datetime.utcnow()
+    emails = [f"student{i}@example.edu" for i in range(users)]
+    user_ids = []
+    for start in range(0, users, 5000):
+        result = users_collection.insert_many([{
+            "email": email, "password": password_hash, "name": f"Student {i}", "role": "user",
+            "active": rng.random() > 0.1, "created_at": now - timedelta(days=rng.randint(0, 365))
+        } for i, email in enumerate(emails[start:start + 5000], start=start)])
+        user_ids.extend(str(_id) for _id in result.inserted_ids)
+    statuses = ["approved"] * 6 + ["pending"] * 2 + ["claimed", "rejected"]
+    for start in range(0, items, 5000):
+        items_collection.insert_many([{
+            "title": " ".join(rng.sample(WORDS, 2)).title(),
+            "description": " ".join(rng.choices(WORDS, k=12)),
+            "category": rng.choice(CATEGORIES),
+            "user_id": rng.choice(user_ids),
+            "status": rng.choice(statuses),
+            "created_at": now - timedelta(minutes=rng.randint(0, 525600)),
+            # Pickup spots within about 3 km of campus
+            "location": {"type": "Point", "coordinates": [CAMPUS[1] + rng.uniform(-0.035, 0.035),
+                                                          CAMPUS[0] + rng.uniform(-0.027, 0.027)]}
+        } for _ in range(min(5000, items - start))])
+    return emails
+
+class Context:
+    """Logged-in clients and pools of ids the write endpoints consume"""
+
+    def __init__(self, app, emails, skip=()):
+        from models.item_model import items_collection
+        from models.user_model import users_collection
+
+        self.app = app
+        self.emails = emails
+        self.skip = set(skip)
+        self.rng = random.Random(7)
+        self.lock = threading.Lock()
+        self.admin = admin_client(app)
+        self.counter = itertools.count()
+        def ids(status):
+            return [str(d['_id']) for d in items_collection.find({"status": status}, {"_id": 1}).limit(20000)]
+        self.approved = ids("approved")
+        self.pending = ids("pending")
+        self.user_ids = [str(d['_id']) for d in users_collection.find({}, {"_id": 1}).limit(20000)]
+        self.cursor = None
+        uploaded = self.student().post("/api/images/", data={"image": (io.BytesIO(photo(0)), "photo.jpg")},
+                                       content_type="multipart/form-data")
+        self.image_id = uploaded.get_json()["image_id"]
+
+    def student(self):
+        """A new test client logged in as a random seeded student"""
+        client = self.app.test_client()
+        client.post("/api/users/login", json={"email": self.rng.choice(self.emails), "password": STUDENT_PASSWORD})
+        return client
+
+    def take(self, pool):
+        with self.lock:
+            return pool.pop() if pool else str(ObjectId())
+
+    def any_approved(self):
+        return self.rng.choice(self.approved) if self.approved else str(ObjectId())
+
+    def some(self, pool, count):
+        """Comma-separated ids for the batch endpoints"""
+        return ",".join(self.rng.sample(pool, min(count, len(pool))) if pool else [str(ObjectId())])
+
+    def unique(self):
+        return next(self.counter)
+
+def endpoint_specs(skip=()):
+    """(name, mix weight, needs student session, request function), leaving out the names in skip"""
+    def next_page(ctx, c):
+        if not ctx.cursor:
+            ctx.cursor = c.get("/api/items/?limit=24").headers.get('X-Next-Cursor')
+        return c.get(f"/api/items/?limit=24&cursor={ctx.cursor}")
+
+    def csv_import(ctx, c):
+        n = ctx.unique()
+        body = "title,description,category\n" + "".join(
+            f"Imported {n}-{i},Bench import row,{ctx.rng.choice(CATEGORIES)}\n" for i in range(50))
+        return ctx.admin.post("/api/admin/items/import", data=io.BytesIO(body.encode()),
+                              content_type="text/csv")
+
+    def upload(ctx, c):
+        return c.post("/api/images/", data={"image": (io.BytesIO(photo(ctx.unique() + 1)), "photo.jpg")},
+                      content_type="multipart/form-data")
+
+    specs = [
+        # user_bp
+        ("POST /api/users/register", 1, False, lambda ctx, c: c.post("/api/users/register", json={
+            "email": f"new{ctx.unique()}-{time.time_ns()}@example.edu",
+            "password": STUDENT_PASSWORD, "name": "New Student"})),
+        ("POST /api/users/login", 3, False, lambda ctx, c: c.post("/api/users/login", json={
+            "email": ctx.rng.choice(ctx.emails), "password": STUDENT_PASSWORD})),
+        ("POST /api/users/logout", 1, True, lambda ctx, c: c.post("/api/users/logout")),
+        ("GET /api/users/profile", 4, True, lambda ctx, c: c.get("/api/users/profile")),
+        ("PUT /api/users/profile", 1, True, lambda ctx, c: c.put("/api/users/profile", json={
+            "name": f"Renamed {ctx.unique()}"})),
+        # item_bp
+        ("GET /api/items/", 30, False, lambda ctx, c: c.get("/api/items/?limit=24")),
+        ("GET /api/items/?category", 15, False, lambda ctx, c: c.get(
+            f"/api/items/?limit=24&category={ctx.rng.choice(CATEGORIES)}")),
+        ("GET /api/items/?cursor", 8, False, next_page),
+        ("GET /api/items/search", 10, False, lambda ctx, c: c.get(
+            f"/api/items/search?q={ctx.rng.choice(WORDS)}&limit=24")),
+        ("GET /api/items/<id>", 12, False, lambda ctx, c: c.get(f"/api/items/{ctx.any_approved()}")),
+        ("GET /api/items/nearby", 5, False, lambda ctx, c: c.get(
+            f"/api/items/nearby?lat={CAMPUS[0]}&lng={CAMPUS[1]}&max_distance=1000&limit=24")),
+        ("GET /api/items/featured", 10, False, lambda ctx, c: c.get("/api/items/featured?limit=4")),
+        ("GET /api/items/batch", 3, False, lambda ctx, c: c.get(f"/api/items/batch?ids={ctx.some(ctx.approved, 20)}")),
+        ("GET /api/items/events", 0.5, False, lambda ctx, c: c.get("/api/items/events")),
+        ("POST /api/items/", 2, True, lambda ctx, c: c.post("/api/items/", json={
+            "title": "Bench item", "description": "Posted by the suite", "category": ctx.rng.choice(CATEGORIES)})),
+        ("POST /api/items/<id>/claim", 2, True, lambda ctx, c: c.post(f"/api/items/{ctx.take(ctx.approved)}/claim")),
+        ("POST /api/items/<id>/reserve", 1, True, lambda ctx, c: c.post(f"/api/items/{ctx.any_approved()}/reserve")),
+        ("DELETE /api/items/<id>/reserve", 1, True, lambda ctx, c: c.delete(f"/api/items/{ctx.any_approved()}/reserve")),
+        ("GET /api/items/my-items", 3, True, lambda ctx, c: c.get("/api/items/my-items")),
+        # admin_bp
+        ("POST /api/admin/login", 0.2, False, lambda ctx, c: c.post("/api/admin/login", json={
+            "email": _common.ADMIN_EMAIL, "password": _common.ADMIN_PASSWORD})),
+        ("GET /api/admin/users", 0.2, False, lambda ctx, c: ctx.admin.get("/api/admin/users?batch_size=1000")),
+        ("GET /api/admin/users/batch", 0.5, False, lambda ctx, c: ctx.admin.get(
+            f"/api/admin/users/batch?ids={ctx.some(ctx.user_ids, 20)}")),
+        ("PATCH /api/admin/users/<id>", 0.2, False, lambda ctx, c: ctx.admin.patch(
+            f"/api/admin/users/{ObjectId()}", json={"active": True})),
+        ("GET /api/admin/items", 0.2, False, lambda ctx, c: ctx.admin.get("/api/admin/items?batch_size=1000")),
+        ("POST /api/admin/items/<id>/moderate", 1, False, lambda ctx, c: ctx.admin.post(
+            f"/api/admin/items/{ctx.take(ctx.pending)}/moderate", json={"action": "approved"})),
+        ("POST /api/admin/items/moderate", 0.2, False, lambda ctx, c: ctx.admin.post(
+            "/api/admin/items/moderate", json={"items": [
+                {"id": ctx.take(ctx.pending), "action": "rejected"} for _ in range(25)]})),
+        ("POST /api/admin/items", 0.5, False, lambda ctx, c: ctx.admin.post("/api/admin/items", json={
+            "title": "Admin item", "description": "Added by the suite", "category": "books", "status": "approved"})),
+        ("POST /api/admin/items/import", 0.1, False, csv_import),
+        ("PUT /api/admin/buildings/<id>", 0.1, False, lambda ctx, c: ctx.admin.put(
+            "/api/admin/buildings/library", json={"name": "Library", "lat": CAMPUS[0], "lng": CAMPUS[1]})),
+        ("GET /api/admin/events", 0.1, False, lambda ctx, c: ctx.admin.get("/api/admin/events")),
+        ("GET /api/admin/jobs", 0.2, False, lambda ctx, c: ctx.admin.get("/api/admin/jobs")),
+        ("GET /api/admin/cache/stats", 0.2, False, lambda ctx, c: ctx.admin.get("/api/admin/cache/stats")),
+        ("GET /api/admin/analytics/users", 1, False, lambda ctx, c: ctx.admin.get("/api/admin/analytics/users")),
+        ("GET /api/admin/analytics/activity", 1, False, lambda ctx, c: ctx.admin.get("/api/admin/analytics/activity")),
+        ("GET /api/admin/analytics/timeseries", 1, False, lambda ctx, c: ctx.admin.get(
+            "/api/admin/analytics/timeseries?metric=posts&granularity=hour")),
+        # image_bp
+        ("POST /api/images/", 0.5, True, upload),
+        ("GET /api/images/<id>", 2, False, lambda ctx, c: c.get(f"/api/images/{ctx.image_id}")),
+        ("GET /api/images/<id>/<variant>", 8, False, lambda ctx, c: c.get(f"/api/images/{ctx.image_id}/320.webp")),
+    ]
+    return [spec for spec in specs if spec[0] not in skip]
+
+def consume(response):
+    # Streamed responses only do their work as the body is read. An event
+    # stream never ends, so time subscribing up to its first chunk instead.
+    if response.mimetype == 'text/event-stream':
+        data = next(response.iter_encoded(), b"")
+    else:
+        data = response.get_data()
+    response.close()
+    return response.status_code, len(data)
+
+def per_endpoint(ctx, counter, requests):
+    """Time each endpoint on its own from a single client"""
+    results = {}
+    student = ctx.student()
+    for name, _, needs_session, fn in endpoint_specs(ctx.skip):
+        latencies, statuses, commands = [], {}, 0
+        for _ in range(requests):
+            client = student if needs_session else ctx.app.test_client()
+            if name == "POST /api/users/logout":
+                client = ctx.student()
+            before = counter.count
+            start = time.perf_counter()
+            status, _ = consume(fn(ctx, client))
+            latencies.append((time.perf_counter() - start) * 1000)
+            commands += counter.count - before
+            statuses[status] = statuses.get(status, 0) + 1
+        total_s = sum(latencies) / 1000
+        results[name] = dict(summarize(latencies),
+                             requests_per_sec=round(requests / total_s, 1) if total_s else None,
+                             db_round_trips_per_request=round(commands / requests, 2),
+                             statuses={str(k): v for k, v in statuses.items()})
+        print(f"{name:<40} {results[name]['requests_per_sec'] or 0:9.1f} req/s  "
+              f"p50 {results[name]['p50_ms']:7.2f}  p95 {results[name]['p95_ms']:7.2f}  "
+              f"p99 {results[name]['p99_ms']:7.2f} ms  {results[name]['db_round_trips_per_request']:5.2f} trips")
+    return results
+
+def mixed(ctx, counter, threads, seconds):
+    """Weighted mix of every endpoint from concurrent clients"""
+    specs = endpoint_specs(ctx.skip)
+    weights = [w for _, w, _, _ in specs]
+    latencies, per_name = [], {}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        student, anonymous = ctx.student(), ctx.app.test_client()
+        while not stop.is_set():
+            name, _, needs_session, fn = rng.choices(specs, weights)[0]
+            start = time.perf_counter()
+            consume(fn(ctx, student if needs_session else anonymous))
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+                per_name.setdefault(name, []).append(elapsed)
+            if name == "POST /api/users/logout":
+                student = ctx.student()
+
+    before = counter.count
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    time.sleep(seconds)
+    stop.set()
+    for w in workers:
+        w.join()
+    result = dict(summarize(latencies),
+                  threads=threads,
+                  requests_per_sec=round(len(latencies) / seconds, 1),
+                  db_round_trips_per_request=round((counter.count - before) / max(1, len(latencies)), 2),
+                  endpoints={name: summarize(v) for name, v in per_name.items()})
+    print(f"{'mixed workload':<40} {result['requests_per_sec']:9.1f} req/s  p50 {result['p50_ms']:7.2f}  "
+          f"p95 {result['p95_ms']:7.2f}  p99 {result['p99_ms']:7.2f} ms  "
+          f"{result['db_round_trips_per_request']:5.2f} trips")
+    return result
+
+def compare(old, new):
+    """Print p50/p99 and round-trip changes against an earlier results file"""
+    print(f"\nCompared with {old.get('commit') or 'previous run'}:")
+    for name, now in new["endpoints"].items():
+        before = old.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        change = lambda key: (now[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+        print(f"{name:<40} p50 {change('p50_ms'):+7.1f}%  p99 {change('p99_ms'):+7.1f}%  "
+              f"trips {before['db_round_trips_per_request']:.2f} -> {now['db_round_trips_per_request']:.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backend', choices=('mongodb', 'mongomock'), default='mongodb')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--items', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=200, help="calls per endpoint")
+    parser.add_argument('--threads', type=int, default=16, help="clients in the mixed workload")
+    parser.add_argument('--seconds', type=float, default=20, help="length of the mixed workload")
+    parser.add_argument('--out', help="write results JSON here")
+    parser.add_argument('--compare', help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    from config import Config
+
+    counter = CommandCounter()
+    # Uploads go to a scratch folder, not the development uploads/
+    overrides = {"IMAGE_STORAGE_DIR": tempfile.mkdtemp(prefix="necessities-suite-images-")}
+    if args.backend == 'mongomock':
+        # Optional stand-in: in-memory, no server needed, no command monitoring
+        use_mongomock()
+        overrides["PASSWORD_HASH_WORKERS"] = 0
+        overrides["MONGODB_ENSURE_INDEXES"] = False
+    else:
+        monitoring.register(counter)
+
+    from app import create_app
+    app = create_app(type("BenchConfig", (Config,), overrides))
+
+    emails = seed(args.users, args.items)
+    ctx = Context(app, emails, skip=MONGOMOCK_UNSUPPORTED if args.backend == 'mongomock' else ())
+    results = {
+        "commit": git_commit(),
+        "started_at": datetime.utcnow().isoformat(),
+        "backend": args.backend,
+        "params": vars(args),
+        "endpoints": per_endpoint(ctx, counter, args.requests),
+        "mixed": mixed(ctx, counter, args.threads, args.seconds)
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
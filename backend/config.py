@@ -7,3 +7,122 @@ class Config:
     DEBUG = os.environ.get('FLASK_DEBUG', True)
     SESSION_TYPE = 'filesystem'
     SESSION_PERMANENT = False
+
+    # MongoDB client (one pool per worker process, see models/db.py)
+    MONGODB_MAX_POOL_SIZE = int(os.environ.get('MONGODB_MAX_POOL_SIZE', 100))
+    MONGODB_MIN_POOL_SIZE = int(os.environ.get('MONGODB_MIN_POOL_SIZE', 0))
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 5000))
+    MONGODB_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGODB_CONNECT_TIMEOUT_MS', 5000))
+    MONGODB_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGODB_SOCKET_TIMEOUT_MS', 30000))
+    MONGODB_COMPRESSORS = os.environ.get('MONGODB_COMPRESSORS', 'zlib')
+    MONGODB_ENSURE_INDEXES = os.environ.get('MONGODB_ENSURE_INDEXES', 'true').lower() == 'true'
+
+    # Item browse pagination
+    ITEMS_PAGE_DEFAULT_LIMIT = int(os.environ.get('ITEMS_PAGE_DEFAULT_LIMIT', 24))
+    ITEMS_PAGE_MAX_LIMIT = int(os.environ.get('ITEMS_PAGE_MAX_LIMIT', 100))
+
+    # Admin dashboard snapshots are recomputed once they are older than this
+    ANALYTICS_SNAPSHOT_TTL = int(os.environ.get('ANALYTICS_SNAPSHOT_TTL', 300))
+
+    # Per-process cache of session principals used by is_admin/get_current_user
+    PRINCIPAL_CACHE_SIZE = int(os.environ.get('PRINCIPAL_CACHE_SIZE', 10000))
+    PRINCIPAL_CACHE_TTL = int(os.environ.get('PRINCIPAL_CACHE_TTL', 30))
+
+    # Admin list endpoints stream documents from the cursor in batches of this size
+    ADMIN_STREAM_BATCH_SIZE = int(os.environ.get('ADMIN_STREAM_BATCH_SIZE', 500))
+    ADMIN_STREAM_MAX_BATCH_SIZE = int(os.environ.get('ADMIN_STREAM_MAX_BATCH_SIZE', 10000))
+
+    # How long POST /api/items/<id>/reserve holds an item for one student
+    ITEM_RESERVATION_SECONDS = int(os.environ.get('ITEM_RESERVATION_SECONDS', 900))
+
+    # Upper bound on items touched by one POST /api/admin/items/moderate
+    BULK_MODERATION_MAX_ITEMS = int(os.environ.get('BULK_MODERATION_MAX_ITEMS', 1000))
+
+    # POST /api/admin/items/import insert_many batch size and error report cap
+    BULK_IMPORT_BATCH_SIZE = int(os.environ.get('BULK_IMPORT_BATCH_SIZE', 1000))
+    BULK_IMPORT_MAX_BATCH_SIZE = int(os.environ.get('BULK_IMPORT_MAX_BATCH_SIZE', 10000))
+    BULK_IMPORT_MAX_ERRORS = int(os.environ.get('BULK_IMPORT_MAX_ERRORS', 1000))
+    # Longer lines are reported as row errors and skipped without being held in memory
+    BULK_IMPORT_MAX_LINE_BYTES = int(os.environ.get('BULK_IMPORT_MAX_LINE_BYTES', 1024 * 1024))
+
+    # Seconds a worker may reuse the catalog version behind item ETags before re-reading it
+    CATALOG_VERSION_MAX_AGE = float(os.environ.get('CATALOG_VERSION_MAX_AGE', 1))
+
+    # Read-through cache for GET /api/items pages: "memory" (per worker) or "redis" (shared)
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+    RESPONSE_CACHE_URL = os.environ.get('RESPONSE_CACHE_URL', 'redis://localhost:6379/0')
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 2048))
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 60))
+
+    # Password hashing (utils/passwords.py). The method string is Werkzeug's and
+    # includes the cost, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000".
+    # Stored hashes made with another method are upgraded on the next login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    # Worker processes; unset means one per CPU, 0 hashes inline on the request thread
+    PASSWORD_HASH_WORKERS = int(os.environ['PASSWORD_HASH_WORKERS']) if 'PASSWORD_HASH_WORKERS' in os.environ else None
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 64))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.environ.get('PASSWORD_HASH_QUEUE_TIMEOUT', 2))
+
+    # run.py serving mode: "wsgi" (Flask dev server) or "asgi" (uvicorn + async item routes)
+    SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
+    SERVER_HOST = os.environ.get('SERVER_HOST', '127.0.0.1')
+    SERVER_PORT = int(os.environ.get('SERVER_PORT', 5000))
+    SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', 1))
+    ASGI_ASYNC_ITEM_ROUTES = os.environ.get('ASGI_ASYNC_ITEM_ROUTES', 'true').lower() == 'true'
+
+    # Request/MongoDB metrics at /metrics, and the threshold for logging slow MongoDB commands
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100))
+
+    # Uploaded images (POST /api/images): originals and resized JPEG/WebP variants on local disk
+    IMAGE_STORAGE_DIR = os.environ.get('IMAGE_STORAGE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads'))
+    IMAGE_MAX_BYTES = int(os.environ.get('IMAGE_MAX_BYTES', 10 * 1024 * 1024))
+    IMAGE_VARIANT_SIZES = tuple(int(s) for s in os.environ.get('IMAGE_VARIANT_SIZES', '320,960').split(','))
+    # Variant worker processes; unset means one per CPU, 0 resizes inline
+    IMAGE_WORKERS = int(os.environ['IMAGE_WORKERS']) if 'IMAGE_WORKERS' in os.environ else None
+
+    # GET /api/items/nearby search radius in meters: default and upper bound
+    NEARBY_DEFAULT_DISTANCE = float(os.environ.get('NEARBY_DEFAULT_DISTANCE', 1500))
+    NEARBY_MAX_DISTANCE = float(os.environ.get('NEARBY_MAX_DISTANCE', 10000))
+
+    # Live item events over SSE: "signals" (this worker's writes) or "change_stream" (all writes; needs a replica set)
+    EVENTS_SOURCE = os.environ.get('EVENTS_SOURCE', 'signals')
+    EVENTS_QUEUE_SIZE = int(os.environ.get('EVENTS_QUEUE_SIZE', 100))
+    EVENTS_MAX_SUBSCRIBERS = int(os.environ.get('EVENTS_MAX_SUBSCRIBERS', 10000))
+    EVENTS_KEEPALIVE_SECONDS = float(os.environ.get('EVENTS_KEEPALIVE_SECONDS', 15))
+
+    # Item lifecycle jobs (models/lifecycle_model.py), run by `python worker.py`
+    # or, with SCHEDULER_IN_PROCESS, by a thread in each web worker
+    SCHEDULER_IN_PROCESS = os.environ.get('SCHEDULER_IN_PROCESS', 'false').lower() == 'true'
+    LIFECYCLE_INTERVAL_SECONDS = int(os.environ.get('LIFECYCLE_INTERVAL_SECONDS', 3600))
+    RESERVATION_SWEEP_SECONDS = int(os.environ.get('RESERVATION_SWEEP_SECONDS', 300))
+    ITEM_APPROVED_TTL_DAYS = int(os.environ.get('ITEM_APPROVED_TTL_DAYS', 90))
+    ITEM_PENDING_TTL_DAYS = int(os.environ.get('ITEM_PENDING_TTL_DAYS', 60))
+    ITEM_ARCHIVE_AFTER_DAYS = int(os.environ.get('ITEM_ARCHIVE_AFTER_DAYS', 30))
+    # Each run touches at most BATCH_SIZE * MAX_BATCHES items per step, so it never hogs the database
+    LIFECYCLE_BATCH_SIZE = int(os.environ.get('LIFECYCLE_BATCH_SIZE', 500))
+    LIFECYCLE_MAX_BATCHES = int(os.environ.get('LIFECYCLE_MAX_BATCHES', 20))
+
+    # Most buckets one /api/admin/analytics/timeseries request may return
+    ANALYTICS_TIMESERIES_MAX_BUCKETS = int(os.environ.get('ANALYTICS_TIMESERIES_MAX_BUCKETS', 2000))
+
+    # GET /api/items/featured: items kept ranked in memory, default page size, rebuild interval
+    FEATURED_ITEMS_MAX = int(os.environ.get('FEATURED_ITEMS_MAX', 12))
+    FEATURED_ITEMS_DEFAULT_LIMIT = int(os.environ.get('FEATURED_ITEMS_DEFAULT_LIMIT', 4))
+    FEATURED_REFRESH_SECONDS = int(os.environ.get('FEATURED_REFRESH_SECONDS', 60))
+
+    # Most ids one /api/items/batch or /api/admin/users/batch request may ask for
+    BATCH_MAX_IDS = int(os.environ.get('BATCH_MAX_IDS', 100))
+
+    # Token buckets per route as endpoint=count/period (per client IP and per signed-in user)
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMITS = os.environ.get('RATE_LIMITS', 'users.login=10/minute,users.register=5/hour,'
+                                 'admin.admin_login=10/minute,items.create_item=20/hour,items.claim_item=10/minute,'
+                                 'items.reserve_item=20/minute,images.upload_image=30/hour')
+    # "memory" (per worker) or "redis" (shared between workers)
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_URL = os.environ.get('RATE_LIMIT_URL', 'redis://localhost:6379/0')
+    RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', 100000))
+    # Requests in flight per worker before new ones get a 503 (0 = no cap); the rate-limited routes get a smaller share
+    RATE_LIMIT_MAX_CONCURRENT = int(os.environ.get('RATE_LIMIT_MAX_CONCURRENT', 64))
+    RATE_LIMIT_MAX_CONCURRENT_LIMITED = int(os.environ.get('RATE_LIMIT_MAX_CONCURRENT_LIMITED', 16))
@@ -1,18 +1,34 @@
-from flask import Blueprint, request, jsonify, session
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from flask import Blueprint, request, jsonify, session, current_app
 from bson import ObjectId
-from werkzeug.security import check_password_hash
-from datetime import datetime, timedelta
-from models.user_model import users_collection
+from bson.errors import InvalidId
+from models.user_model import users_collection, get_users_by_ids
+from models import item_model
 from models.item_model import items_collection
-from utils.auth_utils import is_admin
+from models import analytics_model, building_model, rollup_model
+from utils.auth_utils import is_admin, principal_cache
+from utils.passwords import verify_password
+from utils.streaming import stream_cursor, parse_batch_size
+from utils.bulk_import import READERS, import_rows
+from utils.response_cache import listing_cache
+from utils import events
+from utils.broker import event_stream, broker
+from utils.scheduler import recent_runs
 
 admin_bp = Blueprint('admin', __name__)
 
+def _batch_size():
+    """Cursor batch size for streamed listings, from ?batch_size="""
+    return parse_batch_size(request.args.get('batch_size'),
+                            current_app.config['ADMIN_STREAM_BATCH_SIZE'],
+                            current_app.config['ADMIN_STREAM_MAX_BATCH_SIZE'])
+
 @admin_bp.route("/login", methods=["POST"])
 def admin_login():
     data = request.get_json()
     user = users_collection.find_one({"email": data.get("email"), "role": "admin"})
-    if user and check_password_hash(user['password'], data.get("password")):
+    if user and verify_password(user, data.get("password")):
         session['admin'] = str(user['_id'])
         return jsonify({"message": "Login successful"})
     return jsonify({"error": "Invalid credentials"}), 401
@@ -21,10 +37,23 @@ def admin_login():
 def get_users():
     if not is_admin(session):
         return jsonify({"error": "Unauthorized"}), 403
-    users = list(users_collection.find({}, {"password": 0}))
-    for user in users:
-        user['_id'] = str(user['_id'])
-    return jsonify(users)
+    try:
+        batch_size = _batch_size()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return stream_cursor(users_collection.find({}, {"password": 0}).batch_size(batch_size))
+
+@admin_bp.route("/users/batch", methods=["GET"])
+def get_users_batch():
+    """Get many users by ID (?ids=a,b,c) in one query, keyed by ID"""
+    if not is_admin(session):
+        return jsonify({"error": "Unauthorized"}), 403
+    ids = [user_id for user_id in request.args.get('ids', '').split(',') if user_id]
+    if not ids:
+        return jsonify({"error": "Missing ids"}), 400
+    if len(ids) > current_app.config['BATCH_MAX_IDS']:
+        return jsonify({"error": f"At most {current_app.config['BATCH_MAX_IDS']} ids per request"}), 400
+    return jsonify(get_users_by_ids(ids))
 
 @admin_bp.route("/users/<user_id>", methods=["PATCH"])
 def update_user(user_id):
@@ -32,66 +61,277 @@ def update_user(user_id):
         return jsonify({"error": "Unauthorized"}), 403
     updates = request.get_json()
     users_collection.update_one({"_id": ObjectId(user_id)}, {"$set": updates})
+    events.user_updated.send(current_app._get_current_object(), user_id=user_id, updates=updates)
     return jsonify({"message": "User updated"})
 
 @admin_bp.route("/items", methods=["GET"])
 def get_items():
     if not is_admin(session):
         return jsonify({"error": "Unauthorized"}), 403
-    items = list(items_collection.find({}))
-    for item in items:
-        item['_id'] = str(item['_id'])
-    return jsonify(items)
+    try:
+        batch_size = _batch_size()
+        embeds = item_model.parse_embed(request.args.get('embed'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    cursor = items_collection.find({}).batch_size(batch_size)
+    # One users query per cursor batch, never one per item
+    return stream_cursor(item_model.iter_embedding_users(cursor, embeds, batch_size))
 
 @admin_bp.route("/items/<item_id>/moderate", methods=["POST"])
 def moderate_item(item_id):
     if not is_admin(session):
         return jsonify({"error": "Unauthorized"}), 403
     action = request.get_json().get("action")  # 'approved' or 'rejected'
-    items_collection.update_one({"_id": ObjectId(item_id)}, {"$set": {"status": action}})
+    # Returns the document as it was before, so listeners can see the old status
+    item = items_collection.find_one_and_update({"_id": ObjectId(item_id)},
+                                                {"$set": {"status": action, "moderated_at": datetime.utcnow()}})
+    if item:
+        events.item_moderated.send(current_app._get_current_object(), item=item, status=action)
     return jsonify({"message": f"Item {action}d"})
 
+MODERATION_ACTIONS = ("approved", "rejected")
+BULK_FILTER_FIELDS = ("status", "category", "user_id")
+
+# Body is either {"items": [{"id": ..., "action": ...}, ...]} or
+# {"filter": {"status": "pending", "category": ...}, "action": ...}
+@admin_bp.route("/items/moderate", methods=["POST"])
+def moderate_items():
+    if not is_admin(session):
+        return jsonify({"error": "Unauthorized"}), 403
+    data = request.get_json() or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Body must be a JSON object"}), 400
+    max_items = current_app.config['BULK_MODERATION_MAX_ITEMS']
+    results = []
+    decisions = {}
+    truncated = False
+    
+    if 'filter' in data:
+        action = data.get('action')
+        if action not in MODERATION_ACTIONS:
+            return jsonify({"error": f"Invalid action: {action}"}), 400
+        if not isinstance(data['filter'], dict):
+            return jsonify({"error": "filter must be an object"}), 400
+        query = {k: v for k, v in data['filter'].items() if k in BULK_FILTER_FIELDS}
+        if not query:
+            return jsonify({"error": f"Filter must use one of: {', '.join(BULK_FILTER_FIELDS)}"}), 400
+        # One extra to tell whether the filter matched more than this request may change
+        matches = list(items_collection.find(query, {"_id": 1}).limit(max_items + 1))
+        truncated = len(matches) > max_items
+        for doc in matches[:max_items]:
+            decisions[doc['_id']] = action
+    else:
+        entries = data.get('items') or []
+        if not isinstance(entries, list) or not all(isinstance(entry, dict) for entry in entries):
+            return jsonify({"error": "items must be a list of {id, action} objects"}), 400
+        if len(entries) > max_items:
+            return jsonify({"error": f"At most {max_items} items per request"}), 400
+        for entry in entries:
+            item_id, action = str(entry.get('id')), entry.get('action')
+            if action not in MODERATION_ACTIONS:
+                results.append({"id": item_id, "status": "error", "error": f"Invalid action: {action}"})
+                continue
+            try:
+                decisions[ObjectId(item_id)] = action
+            except InvalidId:
+                results.append({"id": item_id, "status": "error", "error": "Invalid item ID"})
+    
+    previous, conflicts = item_model.moderate_items(decisions) if decisions else ({}, set())
+    for item_id, action in decisions.items():
+        if item_id in previous:
+            results.append({"id": str(item_id), "status": action})
+        elif item_id in conflicts:
+            results.append({"id": str(item_id), "status": "error",
+                            "error": "Item changed while moderating, please retry"})
+        else:
+            results.append({"id": str(item_id), "status": "error", "error": "Item not found"})
+    if previous:
+        # One signal for the whole batch so listeners can react with one write
+        events.items_moderated.send(current_app._get_current_object(),
+                                    items=list(previous.values()),
+                                    statuses={item_id: decisions[item_id] for item_id in previous})
+    
+    return jsonify({
+        "updated": len(previous),
+        "results": results,
+        # Filter mode stops at BULK_MODERATION_MAX_ITEMS; repeat the request for the rest
+        "truncated": truncated
+    })
+
 @admin_bp.route("/items", methods=["POST"])
 def add_item():
     if not is_admin(session):
         return jsonify({"error": "Unauthorized"}), 403
     data = request.get_json()
     items_collection.insert_one(data)
+    events.item_created.send(current_app._get_current_object(), item=data)
     return jsonify({"message": "Item added"})
 
+# Streams an NDJSON or CSV body (chosen by Content-Type or ?format=) into the
+# items collection in insert_many batches; bad rows are reported, not fatal
+@admin_bp.route("/items/import", methods=["POST"])
+def import_items():
+    if not is_admin(session):
+        return jsonify({"error": "Unauthorized"}), 403
+    
+    fmt = request.args.get('format')
+    if not fmt:
+        fmt = "csv" if request.mimetype in ("text/csv", "application/csv") else "ndjson"
+    if fmt not in READERS:
+        return jsonify({"error": f"Unsupported format: {fmt}"}), 400
+    status = request.args.get('status', 'approved')
+    if status not in ("pending", "approved"):
+        return jsonify({"error": f"Invalid status: {status}"}), 400
+    try:
+        batch_size = parse_batch_size(request.args.get('batch_size'),
+                                      current_app.config['BULK_IMPORT_BATCH_SIZE'],
+                                      current_app.config['BULK_IMPORT_MAX_BATCH_SIZE'])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    admin_id = session.get('admin')
+    
+    def build(data):
+        # Same validation as POST /api/items; rows may name their poster
+        user_id = data.get('user_id', admin_id) if isinstance(data, dict) else admin_id
+        return item_model.build_item(data, user_id, status=status)
+    
+    categories = Counter()
+    
+    def insert(batch):
+        inserted, failures = item_model.insert_items(batch)
+        failed = {index for index, _ in failures}
+        categories.update(item['category'] for index, item in enumerate(batch) if index not in failed)
+        return inserted, failures
+    
+    inserted, errors, error_count = import_rows(
+        READERS[fmt](request.stream, current_app.config['BULK_IMPORT_MAX_LINE_BYTES']), build, insert,
+        batch_size=batch_size, max_errors=current_app.config['BULK_IMPORT_MAX_ERRORS']
+    )
+    if inserted:
+        events.items_imported.send(current_app._get_current_object(), count=inserted,
+                                   categories=dict(categories), status=status)
+    
+    return jsonify({
+        "inserted": inserted,
+        "error_count": error_count,
+        "errors": errors
+    }), 200 if not error_count else 207
+
+@admin_bp.route("/buildings/<building_id>", methods=["PUT"])
+def save_building(building_id):
+    """Create or move a campus building that items can name as their pickup spot"""
+    if not is_admin(session):
+        return jsonify({"error": "Unauthorized"}), 403
+    data = request.get_json() or {}
+    try:
+        location = building_model.save_building(building_id, data.get('name', building_id),
+                                                data.get('lat'), data.get('lng'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"building_id": building_id, "location": location})
+
+@admin_bp.route("/events", methods=["GET"])
+def admin_events():
+    """Server-Sent Events for every item change, including pending submissions"""
+    if not is_admin(session):
+        return jsonify({"error": "Unauthorized"}), 403
+    return event_stream(admin=True)
+
+@admin_bp.route("/jobs", methods=["GET"])
+def get_job_runs():
+    """Recent lifecycle job runs with their durations and counts, newest first"""
+    if not is_admin(session):
+        return jsonify({"error": "Unauthorized"}), 403
+    try:
+        limit = max(1, min(int(request.args.get('limit', 50)), 500))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    return jsonify(recent_runs(limit, request.args.get('job')))
+
+@admin_bp.route("/cache/stats", methods=["GET"])
+def get_cache_stats():
+    if not is_admin(session):
+        return jsonify({"error": "Unauthorized"}), 403
+    return jsonify({
+        "principals": principal_cache.stats(),
+        "item_listings": listing_cache.stats(),
+        "event_subscribers": broker.stats(),
+        "rate_limits": current_app.extensions['rate_limiter'].stats()
+        if 'rate_limiter' in current_app.extensions else None
+    })
+
 @admin_bp.route("/analytics/users", methods=["GET"])
 def get_user_stats():
     if not is_admin(session):
         return jsonify({"error": "Unauthorized"}), 403
-    total_users = users_collection.count_documents({})
-    active_users = users_collection.count_documents({"active": True})
-    inactive_users = total_users - active_users
-    now = datetime.utcnow()
-    new_users = {
-        "7_days": users_collection.count_documents({"created_at": {"$gte": now - timedelta(days=7)}}),
-        "30_days": users_collection.count_documents({"created_at": {"$gte": now - timedelta(days=30)}}),
-        "90_days": users_collection.count_documents({"created_at": {"$gte": now - timedelta(days=90)}}),
-    }
+    stats = analytics_model.get_snapshot("users", current_app.config['ANALYTICS_SNAPSHOT_TTL'])
     return jsonify({
-        "total_users": total_users,
-        "active_users": active_users,
-        "inactive_users": inactive_users,
-        "new_users": new_users
+        "total_users": stats["total_users"],
+        "active_users": stats["active_users"],
+        "inactive_users": stats["total_users"] - stats["active_users"],
+        "new_users": stats["new_users"],
+        "as_of": stats["computed_at"].isoformat()
     })
 
 @admin_bp.route("/analytics/activity", methods=["GET"])
 def get_activity_overview():
     if not is_admin(session):
         return jsonify({"error": "Unauthorized"}), 403
-    total_posts = items_collection.count_documents({})
-    category_counts = list(items_collection.aggregate([
-        {"$group": {"_id": "$category", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}}
-    ]))
-    claimed_count = items_collection.count_documents({"status": "claimed"})
-    completion_rate = (claimed_count / total_posts * 100) if total_posts > 0 else 0
+    stats = analytics_model.get_snapshot("activity", current_app.config['ANALYTICS_SNAPSHOT_TTL'])
+    total_posts = stats["total_posts"]
+    category_counts = sorted(
+        ({"_id": category, "count": count} for category, count in stats["category_counts"].items() if count),
+        key=lambda c: c["count"], reverse=True
+    )
+    completion_rate = (stats["claimed_count"] / total_posts * 100) if total_posts > 0 else 0
     return jsonify({
         "total_posts": total_posts,
         "category_counts": category_counts,
-        "completion_rate": completion_rate
-    })
\ No newline at end of file
+        "completion_rate": completion_rate,
+        "as_of": stats["computed_at"].isoformat()
+    })
+
+# Default window when a timeseries request gives no start
+TIMESERIES_DEFAULT_SPAN = {"hour": timedelta(hours=48), "day": timedelta(days=30)}
+
+def _utc(value):
+    """Parse an ISO 8601 time as naive UTC, like the stored timestamps"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+@admin_bp.route("/analytics/timeseries", methods=["GET"])
+def get_timeseries():
+    """Hourly or daily counts of one metric, read from the rollups (one document per bucket)"""
+    if not is_admin(session):
+        return jsonify({"error": "Unauthorized"}), 403
+    metric = request.args.get('metric', 'posts')
+    granularity = request.args.get('granularity', 'day')
+    if metric not in rollup_model.METRICS:
+        return jsonify({"error": f"Invalid metric: {metric}"}), 400
+    if granularity not in rollup_model.GRANULARITIES:
+        return jsonify({"error": f"Invalid granularity: {granularity}"}), 400
+    category = request.args.get('category')
+    if category is not None and metric != 'posts':
+        return jsonify({"error": "category only applies to the posts metric"}), 400
+    
+    try:
+        end = _utc(request.args['end']) if 'end' in request.args else datetime.utcnow()
+        start = _utc(request.args['start']) if 'start' in request.args else end - TIMESERIES_DEFAULT_SPAN[granularity]
+    except ValueError:
+        return jsonify({"error": "start and end must be ISO 8601 dates"}), 400
+    if rollup_model.bucket_count(granularity, start, end) > current_app.config['ANALYTICS_TIMESERIES_MAX_BUCKETS']:
+        return jsonify({"error": "Too many buckets; narrow the range or use a coarser granularity"}), 400
+    
+    try:
+        points = rollup_model.timeseries(metric, granularity, start, end, category)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({
+        "metric": metric,
+        "granularity": granularity,
+        "category": category,
+        "points": [{"t": bucket.isoformat(), "value": value} for bucket, value in points]
+    })
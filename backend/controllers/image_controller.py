@@ -0,0 +1,89 @@
+import os
+from flask import Blueprint, request, jsonify, session, send_file, url_for, abort, current_app
+from utils.auth_utils import get_current_user_id
+from utils.images import image_store, sniff_content_type, InvalidImage, IMAGE_ID_RE, VARIANT_RE, VARIANT_FORMATS
+
+image_bp = Blueprint('images', __name__)
+
+# Image URLs name their content, so they never change
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# An original stood in for a variant that is still being made
+PENDING_VARIANT_MAX_AGE = 60
+# Room for the multipart boundaries and headers around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+def _image_urls(image_id):
+    store = image_store()
+    return {
+        "image_id": image_id,
+        "image_url": url_for('images.get_image', image_id=image_id),
+        "variants": {
+            f"{size}.{extension}": url_for('images.get_variant', image_id=image_id,
+                                           variant=f"{size}.{extension}")
+            for size in store.sizes for extension in VARIANT_FORMATS
+        }
+    }
+
+def _send(path, mimetype, max_age):
+    # conditional=True answers Range and If-None-Match/If-Modified-Since requests
+    response = send_file(path, mimetype=mimetype, conditional=True, etag=True, max_age=max_age)
+    response.cache_control.immutable = max_age == IMMUTABLE_MAX_AGE
+    return response
+
+@image_bp.route("/", methods=["POST"])
+def upload_image():
+    """Upload an image; identical uploads share one stored copy"""
+    user_id = get_current_user_id(session)
+    if not user_id:
+        return jsonify({"error": "Authentication required"}), 401
+
+    # Refuse oversized bodies while reading them, before Werkzeug spools them to disk
+    request.max_content_length = current_app.config['IMAGE_MAX_BYTES'] + MULTIPART_OVERHEAD
+    upload = request.files.get('image')
+    if not upload:
+        return jsonify({"error": "Missing image file"}), 400
+
+    try:
+        image_id, created = image_store().save(upload.stream)
+    except InvalidImage as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(_image_urls(image_id)), 201 if created else 200
+
+@image_bp.errorhandler(413)
+def upload_too_large(e):
+    return jsonify({"error": f"Image is larger than {current_app.config['IMAGE_MAX_BYTES']} bytes"}), 413
+
+@image_bp.route("/<image_id>", methods=["GET"])
+def get_image(image_id):
+    """The original upload"""
+    if not IMAGE_ID_RE.match(image_id):
+        abort(404)
+    path = image_store().original_path(image_id)
+    if not os.path.exists(path):
+        abort(404)
+    with open(path, 'rb') as f:
+        mimetype = sniff_content_type(f.read(16))
+    return _send(path, mimetype, IMMUTABLE_MAX_AGE)
+
+@image_bp.route("/<image_id>/<variant>", methods=["GET"])
+def get_variant(image_id, variant):
+    """A resized variant such as 320.webp, or the original while it is being made"""
+    store = image_store()
+    found = VARIANT_RE.match(variant)
+    if not IMAGE_ID_RE.match(image_id) or not found or int(found['size']) not in store.sizes:
+        abort(404)
+
+    path = store.variant_path(image_id, variant)
+    if os.path.exists(path):
+        return _send(path, VARIANT_FORMATS[found['format']][1], IMMUTABLE_MAX_AGE)
+
+    original = store.original_path(image_id)
+    if not os.path.exists(original):
+        abort(404)
+    # Not made yet (or lost): queue it and serve the original briefly in its place.
+    # Originals Pillow can't decode are remembered and not queued again.
+    store.request_variants(image_id)
+    with open(original, 'rb') as f:
+        mimetype = sniff_content_type(f.read(16))
+    return _send(original, mimetype, PENDING_VARIANT_MAX_AGE)
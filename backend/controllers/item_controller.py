@@ -1,38 +1,189 @@
-from flask import Blueprint, request, jsonify, session
-from bson import ObjectId
+import hashlib
+import math
+from flask import Blueprint, request, jsonify, session, current_app, url_for, g
+from bson.errors import InvalidId
+from models import item_model, lifecycle_model
 from models.item_model import items_collection
+from models.building_model import point, building_location
+from controllers import item_reads
 from utils.auth_utils import get_current_user_id
+from utils.pagination import (ITEM_SORT, split_page, parse_limit, InvalidCursor,
+                              encode_offset_cursor, decode_offset_cursor)
+from utils.search import search_items
+from utils.catalog import conditional, listing_generation
+from utils.response_cache import listing_cache
+from utils import events
+from utils.broker import event_stream
+from utils.featured import featured
 
 item_bp = Blueprint('items', __name__)
 
 @item_bp.route("/", methods=["GET"])
+@conditional
 def get_items():
-    """Get all available items"""
-    query = {"status": "approved"}
+    """Get one page of available items, newest first"""
+    try:
+        plan = item_reads.listing_plan(request.args, current_app.config)
+    except ValueError as e:
+        return jsonify({"error": item_reads.error_message(e)}), 400
+    
+    # Serve repeated pages from the listing cache
+    generation = listing_generation(g.catalog_listings, request.args.get('category'), plan["embeds"])
+    cache_key = listing_cache.key(generation, *plan["cache_key"])
+    cached = listing_cache.get(cache_key)
+    if cached:
+        body, next_cursor = cached
+        return _page_response('items.get_items', body, next_cursor, plan["limit"])
+    
+    # Ask for one extra document to know whether there is a next page
+    docs = list(items_collection.find(plan["query"], plan["projection"])
+                .sort(ITEM_SORT).limit(plan["limit"] + 1))
+    items, next_cursor = split_page(docs, plan["limit"])
+    item_model.embed_users(items, plan["embeds"])
+    body = current_app.json.dumps(items)
+    listing_cache.set(cache_key, body, next_cursor)
+    return _page_response('items.get_items', body, next_cursor, plan["limit"])
+
+@item_bp.route("/search", methods=["GET"])
+@conditional
+def search():
+    """Search available items by title and description, best match first"""
+    try:
+        plan = item_reads.search_plan(request.args, current_app.config)
+    except ValueError as e:
+        return jsonify({"error": item_reads.error_message(e)}), 400
+    
+    items = search_items(items_collection, plan["text"], plan["query"], skip=plan["offset"],
+                         limit=plan["limit"] + 1, projection=plan["projection"]) if plan["limit"] else []
+    items, next_cursor = item_reads.search_page(items, plan)
+    item_model.embed_users(items, plan["embeds"])
+    return _page_response('items.search', current_app.json.dumps(items), next_cursor, plan["limit"])
+
+def _parse_distance(value):
+    """Parse ?max_distance= (meters), capped at NEARBY_MAX_DISTANCE"""
+    if value is None:
+        return current_app.config['NEARBY_DEFAULT_DISTANCE']
+    try:
+        distance = float(value)
+    except ValueError:
+        raise ValueError("max_distance must be a number")
+    # $geoNear rejects negative and non-finite distances with a server error
+    if not math.isfinite(distance) or distance <= 0:
+        raise ValueError("max_distance must be greater than 0")
+    return min(distance, current_app.config['NEARBY_MAX_DISTANCE'])
+
+@item_bp.route("/nearby", methods=["GET"])
+@conditional
+def nearby():
+    """Items with a pickup spot near a point or campus building, nearest first"""
+    args = request.args
+    status = args.get('status', 'approved')
+    if status not in item_model.NEARBY_STATUSES:
+        return jsonify({"error": f"Invalid status: {status}"}), 400
     
-    # Filter by category if provided
-    category = request.args.get('category')
+    query = {"status": status}
+    category = args.get('category')
     if category:
         query["category"] = category
     
-    items = list(items_collection.find(query))
-    for item in items:
-        item['_id'] = str(item['_id'])
+    try:
+        if args.get('building_id'):
+            near = building_location(args['building_id'])
+            if near is None:
+                return jsonify({"error": "Unknown building_id"}), 404
+        else:
+            near = point(args.get('lat'), args.get('lng'))
+        max_distance = _parse_distance(args.get('max_distance'))
+        limit = parse_limit(args.get('limit'),
+                            current_app.config['ITEMS_PAGE_DEFAULT_LIMIT'],
+                            current_app.config['ITEMS_PAGE_MAX_LIMIT'])
+        cursor = args.get('cursor')
+        offset = decode_offset_cursor(cursor) if cursor else 0
+        embeds = item_model.parse_embed(args.get('embed'))
+        projection = item_model.item_projection(args.get('fields'), item_model.CARD_FIELDS,
+                                                required=item_reads.embed_fields(embeds))
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # Distance order has no keyset either, so page by offset up to a cap like search
+    limit = max(0, min(limit, item_model.MAX_NEARBY_RESULTS - offset))
+    items = item_model.nearby_items(near, max_distance, query, skip=offset, limit=limit + 1,
+                                    projection=projection) if limit else []
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_offset_cursor(offset + limit)
     
-    return jsonify(items)
+    item_model.embed_users(items, embeds)
+    return _page_response('items.nearby', current_app.json.dumps(items), next_cursor, limit)
+
+@item_bp.route("/batch", methods=["GET"])
+def get_items_batch():
+    """Get many items by ID (?ids=a,b,c) in one query, in the order asked for"""
+    ids = [item_id for item_id in request.args.get('ids', '').split(',') if item_id]
+    if not ids:
+        return jsonify({"error": "Missing ids"}), 400
+    if len(ids) > current_app.config['BATCH_MAX_IDS']:
+        return jsonify({"error": f"At most {current_app.config['BATCH_MAX_IDS']} ids per request"}), 400
+    try:
+        embeds = item_model.parse_embed(request.args.get('embed'))
+        projection = item_model.item_projection(request.args.get('fields'), item_model.ITEM_FIELDS,
+                                                required=item_reads.embed_fields(embeds))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # Unknown or malformed ids are simply absent from the result
+    items = item_model.get_items_by_ids(ids, projection)
+    return jsonify(item_model.embed_users(items, embeds))
+
+@item_bp.route("/featured", methods=["GET"])
+def featured_items():
+    """A few recent, available items across categories, for the home page"""
+    try:
+        limit = parse_limit(request.args.get('limit'),
+                            current_app.config['FEATURED_ITEMS_DEFAULT_LIMIT'],
+                            current_app.config['FEATURED_ITEMS_MAX'])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    # Precomputed and pre-encoded; no database work on this path
+    body = featured.get(limit) + "\n"
+    response = current_app.response_class(body, mimetype='application/json')
+    # The ranking can lag the catalog version, so the ETag comes from the body actually served
+    response.set_etag(hashlib.sha1(body.encode()).hexdigest()[:20], weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+@item_bp.route("/events", methods=["GET"])
+def item_events():
+    """Server-Sent Events: item-created, item-approved (items-approved for a bulk approval) and item-claimed"""
+    return event_stream()
+
+def _page_response(endpoint, body, next_cursor, limit):
+    """JSON list response advertising the next page in X-Next-Cursor and Link headers"""
+    response = current_app.response_class(body + "\n", mimetype='application/json')
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        args['limit'] = limit
+        response.headers['Link'] = f'<{url_for(endpoint, **args)}>; rel="next"'
+    return response
 
 @item_bp.route("/<item_id>", methods=["GET"])
+@conditional
 def get_item(item_id):
     """Get a specific item by ID"""
     try:
-        item = items_collection.find_one({"_id": ObjectId(item_id)})
-        if not item:
-            return jsonify({"error": "Item not found"}), 404
-        
-        item['_id'] = str(item['_id'])
-        return jsonify(item)
-    except:
-        return jsonify({"error": "Invalid item ID"}), 400
+        plan = item_reads.detail_plan(request.args, item_id)
+    except ValueError as e:
+        return jsonify({"error": item_reads.error_message(e)}), 400
+    
+    item = items_collection.find_one({"_id": plan["_id"]}, plan["projection"])
+    if not item:
+        return jsonify({"error": "Item not found"}), 404
+    return jsonify(item_model.embed_users([item], plan["embeds"])[0])
 
 @item_bp.route("/", methods=["POST"])
 def create_item():
@@ -41,29 +192,14 @@ def create_item():
     if not user_id:
         return jsonify({"error": "Authentication required"}), 401
     
-    data = request.get_json()
-    required_fields = ['title', 'description', 'category']
-    
-    # Validate required fields
-    for field in required_fields:
-        if field not in data:
-            return jsonify({"error": f"Missing required field: {field}"}), 400
-    
-    # Create new item
-    new_item = {
-        "title": data['title'],
-        "description": data['description'],
-        "category": data['category'],
-        "user_id": user_id,
-        "status": "pending",  # Items need admin approval
-        "created_at": datetime.utcnow()
-    }
-    
-    # Add optional fields
-    if 'image_url' in data:
-        new_item['image_url'] = data['image_url']
+    # Items need admin approval
+    try:
+        new_item = item_model.build_item(request.get_json(), user_id, status="pending")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
     result = items_collection.insert_one(new_item)
+    events.item_created.send(current_app._get_current_object(), item=new_item)
     return jsonify({
         "message": "Item created successfully",
         "item_id": str(result.inserted_id)
@@ -77,28 +213,55 @@ def claim_item(item_id):
         return jsonify({"error": "Authentication required"}), 401
     
     try:
-        # Check if item exists and is available
-        item = items_collection.find_one({
-            "_id": ObjectId(item_id),
-            "status": "approved"
-        })
-        
-        if not item:
-            return jsonify({"error": "Item not found or not available"}), 404
-        
-        # Update item status
-        items_collection.update_one(
-            {"_id": ObjectId(item_id)},
-            {"$set": {
-                "status": "claimed",
-                "claimed_by": user_id,
-                "claimed_at": datetime.utcnow()
-            }}
-        )
-        
-        return jsonify({"message": "Item claimed successfully"})
-    except:
+        item = item_model.claim_item(item_id, user_id)
+    except InvalidId:
         return jsonify({"error": "Invalid item ID"}), 400
+    
+    if not item:
+        return jsonify({"error": "Item not found or not available"}), 404
+    
+    events.item_claimed.send(current_app._get_current_object(), item=item, user_id=user_id)
+    return jsonify({"message": "Item claimed successfully"})
+
+@item_bp.route("/<item_id>/reserve", methods=["POST"])
+def reserve_item(item_id):
+    """Hold an item for the current user for a limited time"""
+    user_id = get_current_user_id(session)
+    if not user_id:
+        return jsonify({"error": "Authentication required"}), 401
+    
+    hold_seconds = current_app.config['ITEM_RESERVATION_SECONDS']
+    try:
+        item = item_model.reserve_item(item_id, user_id, hold_seconds)
+    except InvalidId:
+        return jsonify({"error": "Invalid item ID"}), 400
+    
+    if not item:
+        return jsonify({"error": "Item not found or not available"}), 409
+    
+    events.item_reservation_changed.send(current_app._get_current_object(), item=item, user_id=user_id)
+    return jsonify({
+        "message": "Item reserved",
+        "reserved_until": item['reserved_until'].isoformat()
+    })
+
+@item_bp.route("/<item_id>/reserve", methods=["DELETE"])
+def release_item(item_id):
+    """Release the current user's hold on an item"""
+    user_id = get_current_user_id(session)
+    if not user_id:
+        return jsonify({"error": "Authentication required"}), 401
+    
+    try:
+        item = item_model.release_reservation(item_id, user_id)
+    except InvalidId:
+        return jsonify({"error": "Invalid item ID"}), 400
+    
+    if not item:
+        return jsonify({"error": "No reservation to release"}), 404
+    
+    events.item_reservation_changed.send(current_app._get_current_object(), item=item, user_id=user_id)
+    return jsonify({"message": "Reservation released"})
 
 @item_bp.route("/my-items", methods=["GET"])
 def get_my_items():
@@ -107,8 +270,13 @@ def get_my_items():
     if not user_id:
         return jsonify({"error": "Authentication required"}), 401
     
-    items = list(items_collection.find({"user_id": user_id}))
-    for item in items:
-        item['_id'] = str(item['_id'])
+    try:
+        embeds = item_model.parse_embed(request.args.get('embed'))
+        projection = item_model.item_projection(request.args.get('fields'), item_model.ITEM_FIELDS,
+                                                required=item_reads.embed_fields(embeds))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     
-    return jsonify(items)
\ No newline at end of file
+    # Claimed and expired posts move to items_archive after a while; students still see them here
+    items = lifecycle_model.get_items_by_user(user_id, projection)
+    return jsonify(item_model.embed_users(items, embeds))
\ No newline at end of file
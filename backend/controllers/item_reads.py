@@ -0,0 +1,82 @@
+from bson import ObjectId
+from bson.errors import InvalidId
+from models import item_model
+from utils.pagination import (page_query, parse_limit, InvalidCursor,
+                              encode_offset_cursor, decode_offset_cursor)
+from utils.search import MAX_SEARCH_RESULTS
+
+# Request parsing and response assembly for the item read routes (browse,
+# search, detail), shared by the Flask views in item_controller.py and the
+# async views in asgi.py. Each side only runs the database calls itself.
+# The *_plan functions raise ValueError with a client-facing message.
+
+def error_message(error):
+    """The 400 message for a ValueError raised by a plan"""
+    return "Invalid cursor" if isinstance(error, InvalidCursor) else str(error)
+
+def embed_fields(embeds):
+    """Fields the projection must keep so ?embed= can resolve them"""
+    return tuple(item_model.EMBEDS[name][0] for name in embeds)
+
+def _approved(args):
+    query = {"status": "approved"}
+    category = args.get('category')
+    if category:
+        query["category"] = category
+    return query
+
+def _limit(args, config):
+    return parse_limit(args.get('limit'), config['ITEMS_PAGE_DEFAULT_LIMIT'], config['ITEMS_PAGE_MAX_LIMIT'])
+
+def listing_plan(args, config):
+    """GET /api/items: the keyset page query, projection, limit, embeds and listing cache key parts"""
+    cursor = args.get('cursor')
+    fields = args.get('fields')
+    limit = _limit(args, config)
+    embeds = item_model.parse_embed(args.get('embed'))
+    return {
+        "query": page_query(_approved(args), cursor),
+        # The next-page cursor is built from created_at, so always fetch it
+        "projection": item_model.item_projection(fields, item_model.CARD_FIELDS,
+                                                 required=('created_at', *embed_fields(embeds))),
+        "limit": limit,
+        "embeds": embeds,
+        "cache_key": (args.get('category'), cursor, limit, fields, embeds)
+    }
+
+def search_plan(args, config):
+    """GET /api/items/search: the text, filter, offset window, projection and embeds"""
+    text = args.get('q', '').strip()
+    if not text:
+        raise ValueError("Missing search query")
+    limit = _limit(args, config)
+    cursor = args.get('cursor')
+    offset = decode_offset_cursor(cursor) if cursor else 0
+    embeds = item_model.parse_embed(args.get('embed'))
+    return {
+        "text": text,
+        "query": _approved(args),
+        "offset": offset,
+        # Relevance order has no keyset, so cap how deep clients can page
+        "limit": max(0, min(limit, MAX_SEARCH_RESULTS - offset)),
+        "projection": item_model.item_projection(args.get('fields'), item_model.CARD_FIELDS,
+                                                 required=embed_fields(embeds)),
+        "embeds": embeds
+    }
+
+def search_page(items, plan):
+    """Trim a limit + 1 search fetch to one page; returns (items, next_cursor)"""
+    if len(items) > plan["limit"]:
+        return items[:plan["limit"]], encode_offset_cursor(plan["offset"] + plan["limit"])
+    return items, None
+
+def detail_plan(args, item_id):
+    """GET /api/items/<id>: the item's ObjectId, projection and embeds"""
+    embeds = item_model.parse_embed(args.get('embed'))
+    projection = item_model.item_projection(args.get('fields'), item_model.ITEM_FIELDS,
+                                            required=embed_fields(embeds))
+    try:
+        _id = ObjectId(item_id)
+    except (InvalidId, TypeError):
+        raise ValueError("Invalid item ID")
+    return {"_id": _id, "projection": projection, "embeds": embeds}
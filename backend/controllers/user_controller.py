@@ -1,7 +1,11 @@
-from flask import Blueprint, request, jsonify, session
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import Blueprint, request, jsonify, session, current_app
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from models.user_model import users_collection
 from datetime import datetime
+from utils.auth_utils import get_current_user
+from utils.passwords import hash_password, verify_password
+from utils import events
 
 user_bp = Blueprint('users', __name__)
 
@@ -23,14 +27,19 @@ def register():
     # Create new user
     new_user = {
         "email": data['email'],
-        "password": generate_password_hash(data['password']),
+        "password": hash_password(data['password']),
         "name": data['name'],
         "role": "user",  # Default role
         "active": True,
         "created_at": datetime.utcnow()
     }
     
-    result = users_collection.insert_one(new_user)
+    try:
+        result = users_collection.insert_one(new_user)
+    except DuplicateKeyError:
+        # Lost a race with a concurrent registration for the same email (email_unique index)
+        return jsonify({"error": "Email already registered"}), 400
+    events.user_registered.send(current_app._get_current_object(), user=new_user)
     
     # Set session
     session['user_id'] = str(result.inserted_id)
@@ -53,7 +62,7 @@ def login():
     user = users_collection.find_one({"email": data['email']})
     
     # Check if user exists and password is correct
-    if user and check_password_hash(user['password'], data['password']):
+    if user and verify_password(user, data['password']):
         session['user_id'] = str(user['_id'])
         
         # Return user info (excluding password)
@@ -83,7 +92,7 @@ def get_profile():
     if 'user_id' not in session:
         return jsonify({"error": "Not authenticated"}), 401
     
-    user = users_collection.find_one({"_id": ObjectId(session['user_id'])})
+    user = get_current_user(session)
     
     if not user:
         session.pop('user_id', None)
@@ -118,12 +127,14 @@ def update_profile():
     
     # Update password if provided
     if 'password' in data:
-        updates['password'] = generate_password_hash(data['password'])
+        updates['password'] = hash_password(data['password'])
     
     if updates:
         users_collection.update_one(
             {"_id": ObjectId(session['user_id'])},
             {"$set": updates}
         )
+        events.user_updated.send(current_app._get_current_object(),
+                                 user_id=session['user_id'], updates=updates)
     
     return jsonify({"message": "Profile updated successfully"})
\ No newline at end of file
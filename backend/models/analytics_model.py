@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+from models.user_model import users_collection
+from models.item_model import items_collection
+from models.lifecycle_model import items_archive_collection
+from models.db import collection
+from utils import events
+
+# One materialized snapshot document per dashboard endpoint, keyed by name.
+# Reads are served from here until the snapshot is older than the TTL; the
+# write paths bump the counters in place so they stay close in between.
+analytics_collection = collection('analytics')
+
+NEW_USER_WINDOWS = (7, 30, 90)
+
+def _count(facet_result, key):
+    # A {"$count": ...} facet yields [] rather than [{"n": 0}] when nothing matched
+    rows = facet_result.get(key)
+    return rows[0]["n"] if rows else 0
+
+def compute_user_stats():
+    """Compute the user dashboard numbers in a single aggregation"""
+    now = datetime.utcnow()
+    facets = {
+        "total": [{"$count": "n"}],
+        "active": [{"$match": {"active": True}}, {"$count": "n"}]
+    }
+    for days in NEW_USER_WINDOWS:
+        facets[f"new_{days}"] = [
+            {"$match": {"created_at": {"$gte": now - timedelta(days=days)}}},
+            {"$count": "n"}
+        ]
+    result = next(users_collection.aggregate([{"$facet": facets}]), {})
+    return {
+        "total_users": _count(result, "total"),
+        "active_users": _count(result, "active"),
+        "new_users": {f"{days}_days": _count(result, f"new_{days}") for days in NEW_USER_WINDOWS}
+    }
+
+def _activity_facets(source):
+    result = next(source.aggregate([{"$facet": {
+        "total": [{"$count": "n"}],
+        "claimed": [{"$match": {"status": "claimed"}}, {"$count": "n"}],
+        "categories": [{"$group": {"_id": "$category", "count": {"$sum": 1}}}]
+    }}]), {})
+    return {
+        "total_posts": _count(result, "total"),
+        "claimed_count": _count(result, "claimed"),
+        "category_counts": {str(c["_id"]): c["count"] for c in result.get("categories", [])}
+    }
+
+def compute_activity():
+    """Compute the activity dashboard numbers, counting archived items too"""
+    stats = _activity_facets(items_collection)
+    archived = _activity_facets(items_archive_collection)
+    stats["total_posts"] += archived["total_posts"]
+    stats["claimed_count"] += archived["claimed_count"]
+    # Stored as a map so writes can $inc a single category
+    for category, count in archived["category_counts"].items():
+        stats["category_counts"][category] = stats["category_counts"].get(category, 0) + count
+    return stats
+
+SNAPSHOTS = {
+    "users": compute_user_stats,
+    "activity": compute_activity
+}
+
+def get_snapshot(name, ttl_seconds):
+    """Return the named snapshot, recomputing it if missing or older than ttl_seconds"""
+    now = datetime.utcnow()
+    snapshot = analytics_collection.find_one({"_id": name})
+    if snapshot and snapshot.get("computed_at") and snapshot["computed_at"] > now - timedelta(seconds=ttl_seconds):
+        return snapshot
+    snapshot = SNAPSHOTS[name]()
+    snapshot["computed_at"] = now
+    analytics_collection.replace_one({"_id": name}, snapshot, upsert=True)
+    return snapshot
+
+def invalidate(name):
+    """Force the next read of the named snapshot to recompute"""
+    analytics_collection.update_one({"_id": name}, {"$unset": {"computed_at": ""}})
+
+def _bump(name, increments):
+    # Only adjust an existing snapshot; a missing one is computed on next read
+    analytics_collection.update_one({"_id": name}, {"$inc": increments})
+
+def _category_key(category):
+    category = str(category)
+    # Field names can't contain dots or start with $, so those fall back to a recompute
+    if not category or '.' in category or category.startswith('$'):
+        return None
+    return f"category_counts.{category}"
+
+@events.item_created.connect
+def _on_item_created(sender, item, **extra):
+    key = _category_key(item.get("category"))
+    if key is None:
+        invalidate("activity")
+        return
+    increments = {"total_posts": 1, key: 1}
+    if item.get("status") == "claimed":
+        increments["claimed_count"] = 1
+    _bump("activity", increments)
+
+@events.items_imported.connect
+def _on_items_imported(sender, count, **extra):
+    # Cheaper to recompute once than to bump per imported row
+    invalidate("activity")
+
+def _claimed_delta(item, status):
+    return (status == "claimed") - (item.get("status") == "claimed")
+
+@events.item_moderated.connect
+def _on_item_moderated(sender, item, status, **extra):
+    delta = _claimed_delta(item, status)
+    if delta:
+        _bump("activity", {"claimed_count": delta})
+
+@events.items_moderated.connect
+def _on_items_moderated(sender, items, statuses, **extra):
+    delta = sum(_claimed_delta(item, statuses[item["_id"]]) for item in items)
+    if delta:
+        _bump("activity", {"claimed_count": delta})
+
+@events.item_claimed.connect
+def _on_item_claimed(sender, item, **extra):
+    _bump("activity", {"claimed_count": 1})
+
+@events.user_registered.connect
+def _on_user_registered(sender, user, **extra):
+    increments = {"total_users": 1}
+    if user.get("active", True):
+        increments["active_users"] = 1
+    for days in NEW_USER_WINDOWS:
+        increments[f"new_users.{days}_days"] = 1
+    _bump("users", increments)
+
+@events.user_updated.connect
+def _on_user_updated(sender, user_id, updates, **extra):
+    if "active" in updates:
+        invalidate("users")
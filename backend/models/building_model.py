@@ -0,0 +1,37 @@
+from models.db import collection
+from utils.cache import LRUCache
+
+buildings_collection = collection('buildings')
+
+# Buildings rarely change, and every item posted with a building_id needs one
+_locations = LRUCache(maxsize=1024, ttl=300)
+
+def point(lat, lng):
+    """GeoJSON point for a latitude/longitude pair, validating both"""
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        raise ValueError("lat and lng must be numbers")
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("lat/lng out of range")
+    return {"type": "Point", "coordinates": [lng, lat]}
+
+def save_building(building_id, name, lat, lng):
+    """Create or update a campus building and its pickup location"""
+    location = point(lat, lng)
+    buildings_collection.update_one({"_id": building_id},
+                                    {"$set": {"name": name, "location": location}},
+                                    upsert=True)
+    _locations.delete(building_id)
+    return location
+
+def building_location(building_id):
+    """GeoJSON point of a campus building, or None if there is no such building"""
+    location = _locations.get(building_id)
+    if location is None:
+        building = buildings_collection.find_one({"_id": building_id}, {"location": 1})
+        if not building:
+            return None
+        location = building['location']
+        _locations.set(building_id, location)
+    return location
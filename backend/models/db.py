@@ -0,0 +1,86 @@
+import os
+import threading
+from pymongo import MongoClient, AsyncMongoClient
+from config import Config
+
+# One MongoClient per process, created on first use rather than at import.
+# PyMongo clients must not be shared across fork(), so a worker forked from a
+# process that already connected (e.g. gunicorn --preload) builds its own.
+_client = None
+_client_pid = None
+_async_client = None
+_async_client_pid = None
+_lock = threading.Lock()
+
+def _client_options(config):
+    options = {
+        "maxPoolSize": config.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": config.MONGODB_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": config.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": config.MONGODB_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": config.MONGODB_SOCKET_TIMEOUT_MS,
+        # Don't start monitor threads until the first operation
+        "connect": False
+    }
+    if config.MONGODB_COMPRESSORS:
+        options["compressors"] = config.MONGODB_COMPRESSORS
+    return options
+
+def get_client():
+    """The process-wide MongoClient, created lazily"""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _lock:
+            if _client is None or _client_pid != pid:
+                _client = MongoClient(Config.MONGODB_URI, **_client_options(Config))
+                _client_pid = pid
+    return _client
+
+def get_async_client():
+    """The process-wide AsyncMongoClient used by the ASGI item routes, created lazily"""
+    global _async_client, _async_client_pid
+    pid = os.getpid()
+    if _async_client is None or _async_client_pid != pid:
+        with _lock:
+            if _async_client is None or _async_client_pid != pid:
+                _async_client = AsyncMongoClient(Config.MONGODB_URI, **_client_options(Config))
+                _async_client_pid = pid
+    return _async_client
+
+def get_async_db():
+    """The application database, for async code"""
+    return get_async_client().get_default_database()
+
+def set_client(client):
+    """Use the given client instead (benchmarks and local stand-ins)"""
+    global _client, _client_pid
+    with _lock:
+        _client = client
+        _client_pid = os.getpid()
+
+def get_db():
+    """The application database named in MONGODB_URI"""
+    return get_client().get_default_database()
+
+class LazyCollection:
+    """Module-level handle to a collection that resolves the client on first use"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def _collection(self):
+        return get_db()[self.name]
+
+    def __getattr__(self, attr):
+        return getattr(self._collection(), attr)
+
+    def __getitem__(self, key):
+        return self._collection()[key]
+
+    def __repr__(self):
+        return f"LazyCollection({self.name!r})"
+
+def collection(name):
+    """Lazy handle to the named collection"""
+    return LazyCollection(name)
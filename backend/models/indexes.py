@@ -0,0 +1,147 @@
+import logging
+import threading
+import click
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING, GEOSPHERE
+from pymongo.errors import PyMongoError
+from models.user_model import users_collection
+from models.item_model import items_collection
+from utils.search import TEXT_INDEX_KEYS, TEXT_INDEX_WEIGHTS, TEXT_INDEX_NAME
+from utils.scheduler import job_runs_collection
+from models.rollup_model import rollups_collection
+from models.lifecycle_model import items_archive_collection
+
+logger = logging.getLogger(__name__)
+
+COLLECTIONS = {
+    "users": users_collection,
+    "items": items_collection,
+    "items_archive": items_archive_collection,
+    "job_runs": job_runs_collection,
+    "rollups": rollups_collection
+}
+
+# Every index the app relies on, by collection. create_indexes is a no-op for
+# indexes that already exist with the same spec, so this is safe to apply on every start.
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("created_at", DESCENDING)], name="created_at"),
+        IndexModel([("active", ASCENDING)], name="active")
+    ],
+    "items": [
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="status_created"),
+        IndexModel([("status", ASCENDING), ("category", ASCENDING),
+                    ("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="status_category_created"),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created"),
+        IndexModel([("category", ASCENDING)], name="category"),
+        IndexModel(TEXT_INDEX_KEYS, name=TEXT_INDEX_NAME, weights=TEXT_INDEX_WEIGHTS),
+        # /api/items/nearby; items without a location are simply not in this index
+        IndexModel([("location", GEOSPHERE), ("status", ASCENDING), ("category", ASCENDING)],
+                   name="location_status_category"),
+        # The release-reservations sweep; only items on hold have the field
+        IndexModel([("reserved_until", ASCENDING)], name="reserved_until", sparse=True)
+    ],
+    # A student's archived posts under /api/items/my-items
+    "items_archive": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created")
+    ],
+    # Recent runs for /api/admin/jobs; the records drop off after 30 days
+    "job_runs": [
+        IndexModel([("started_at", DESCENDING)], name="started_at_ttl", expireAfterSeconds=30 * 24 * 3600)
+    ],
+    "rollups": [
+        IndexModel([("granularity", ASCENDING), ("bucket", ASCENDING)], name="granularity_bucket")
+    ]
+}
+
+# The hot query shapes, with representative values, that must be served by an index.
+# Each entry is (name, collection, filter, sort).
+_now = datetime.utcnow()
+QUERY_SHAPES = [
+    ("register/login by email", "users", {"email": "student@example.edu"}, None),
+    ("admin login", "users", {"email": "admin@example.edu", "role": "admin"}, None),
+    ("active user count", "users", {"active": True}, None),
+    ("new user count", "users", {"created_at": {"$gte": _now - timedelta(days=30)}}, None),
+    ("browse items", "items", {"status": "approved"},
+     [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("browse items by category", "items", {"status": "approved", "category": "books"},
+     [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("browse items next page", "items",
+     {"$and": [{"status": "approved"}, {"$or": [
+         {"created_at": {"$lt": _now}},
+         {"created_at": _now, "_id": {"$lt": ObjectId()}},
+         {"created_at": None}
+     ]}]},
+     [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("search items", "items", {"status": "approved", "$text": {"$search": "desk lamp"}}, None),
+    ("nearby items", "items",
+     {"status": "approved", "location": {"$nearSphere": {
+         "$geometry": {"type": "Point", "coordinates": [-75.0, 40.0]}, "$maxDistance": 2000}}}, None),
+    ("my items", "items", {"user_id": "000000000000000000000000"}, [("created_at", DESCENDING)]),
+    ("my archived items", "items_archive", {"user_id": "000000000000000000000000"},
+     [("created_at", DESCENDING)]),
+    ("expired holds", "items", {"reserved_until": {"$lte": _now}}, None),
+    ("claimed item count", "items", {"status": "claimed"}, None),
+    ("analytics timeseries", "rollups",
+     {"granularity": "day", "bucket": {"$gte": _now - timedelta(days=30), "$lt": _now}}, None)
+]
+
+def ensure_indexes():
+    """Create every registered index; returns the names that were applied"""
+    applied = []
+    for name, models in INDEXES.items():
+        applied.extend(COLLECTIONS[name].create_indexes(models))
+    return applied
+
+def _stages(plan):
+    """All stage names in an explain() plan tree"""
+    if isinstance(plan, dict):
+        stages = [plan['stage']] if 'stage' in plan else []
+        for value in plan.values():
+            stages.extend(_stages(value))
+        return stages
+    if isinstance(plan, list):
+        return [stage for child in plan for stage in _stages(child)]
+    return []
+
+def verify_query_plans():
+    """Explain each registered query shape; returns a list of (name, stages, uses_index)"""
+    results = []
+    for name, collection, query, sort in QUERY_SHAPES:
+        cursor = COLLECTIONS[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = cursor.explain()['queryPlanner']['winningPlan']
+        stages = _stages(plan)
+        results.append((name, stages, 'COLLSCAN' not in stages))
+    return results
+
+def _ensure_indexes_in_background():
+    try:
+        applied = ensure_indexes()
+        logger.info("Applied MongoDB indexes: %s", ", ".join(applied))
+    except PyMongoError as e:
+        # Don't take the app down over an index (e.g. duplicate emails); log it loudly instead
+        logger.error("Could not apply MongoDB indexes: %s", e)
+
+def init_app(app):
+    """Apply the index registry in the background and register the `check-indexes` command"""
+    if app.config.get('MONGODB_ENSURE_INDEXES', True):
+        # Off the startup path: with MongoDB unreachable this would otherwise hold up
+        # create_app() for the whole server selection timeout
+        threading.Thread(target=_ensure_indexes_in_background, name="ensure-indexes", daemon=True).start()
+
+    @app.cli.command('check-indexes')
+    def check_indexes():
+        """Apply indexes, then fail if any hot query falls back to a collection scan"""
+        ensure_indexes()
+        failed = False
+        for name, stages, uses_index in verify_query_plans():
+            click.echo(f"{'ok  ' if uses_index else 'FAIL'} {name}: {' > '.join(stages)}")
+            failed = failed or not uses_index
+        if failed:
+            raise SystemExit(1)
@@ -1,11 +1,76 @@
-from pymongo import MongoClient
-from datetime import datetime
-from config import Config
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from models.db import collection
+from models.building_model import point, building_location
+from models.user_model import object_ids, get_user_names
+from utils.images import IMAGE_ID_RE
 
-# Initialize MongoDB client
-client = MongoClient(Config.MONGODB_URI)
-db = client.get_default_database()
-items_collection = db.items
+items_collection = collection('items')
+
+REQUIRED_FIELDS = ('title', 'description', 'category')
+OPTIONAL_FIELDS = ('image_url', 'image_id')
+
+# Fields clients may ask for with ?fields=; reservation holders stay private
+ITEM_FIELDS = REQUIRED_FIELDS + OPTIONAL_FIELDS + (
+    'user_id', 'status', 'created_at', 'claimed_by', 'claimed_at', 'reserved_until',
+    'location', 'building_id')
+# What the browse grid's ItemCard renders
+CARD_FIELDS = ('title', 'description', 'category', 'image_url', 'image_id', 'status', 'created_at')
+
+def item_projection(fields, default, required=()):
+    """Mongo projection for a ?fields= value, or the view's default fields when it is absent"""
+    if fields is None:
+        selected = list(default)
+    else:
+        selected = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = [field for field in selected if field not in ITEM_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown field: {unknown[0]}")
+    # _id is always returned; callers add what they need internally (e.g. cursor keys)
+    return {field: 1 for field in (*selected, *required)}
+
+def build_item(data, user_id, status="pending"):
+    """Validate submitted item fields and build the document to insert"""
+    if not isinstance(data, dict):
+        raise ValueError("Item must be a JSON object")
+    
+    # Validate required fields
+    for field in REQUIRED_FIELDS:
+        if field not in data:
+            raise ValueError(f"Missing required field: {field}")
+    
+    item = {field: data[field] for field in REQUIRED_FIELDS}
+    item.update({
+        "user_id": user_id,
+        "status": status,
+        "created_at": datetime.utcnow()
+    })
+    
+    # Add optional fields
+    for field in OPTIONAL_FIELDS:
+        if field in data:
+            item[field] = data[field]
+    
+    # Uploaded through POST /api/images; the card view shows its thumbnail
+    if 'image_id' in item and not (isinstance(item['image_id'], str) and IMAGE_ID_RE.match(item['image_id'])):
+        raise ValueError("Invalid image_id")
+    
+    # Optional pickup spot: explicit coordinates, or a campus building's
+    location = data.get('location')
+    if location is not None:
+        if not isinstance(location, dict):
+            raise ValueError("location must be an object with lat and lng")
+        item['location'] = point(location.get('lat'), location.get('lng'))
+    if data.get('building_id') is not None:
+        building_id = str(data['building_id'])
+        building = building_location(building_id)
+        if building is None:
+            raise ValueError(f"Unknown building_id: {building_id}")
+        item['building_id'] = building_id
+        item.setdefault('location', building)
+    return item
 
 def create_item(title, description, category, user_id):
     """Create a new item in the database"""
@@ -20,15 +85,175 @@ def create_item(title, description, category, user_id):
     result = items_collection.insert_one(item)
     return str(result.inserted_id)
 
+# Statuses anyone may browse by distance, and how deep nearby results can page
+NEARBY_STATUSES = ('approved', 'claimed')
+MAX_NEARBY_RESULTS = 1000
+
+def nearby_items(near, max_distance, query, skip=0, limit=20, projection=None):
+    """Items matching query within max_distance meters of a point, nearest first.
+    
+    Each result carries its `distance` in meters.
+    """
+    pipeline = [
+        {"$geoNear": {
+            "near": near,
+            "key": "location",
+            "distanceField": "distance",
+            "maxDistance": max_distance,
+            "query": query,
+            "spherical": True
+        }},
+        {"$skip": skip},
+        {"$limit": limit}
+    ]
+    if projection:
+        pipeline.append({"$project": {**projection, "distance": 1}})
+    return list(items_collection.aggregate(pipeline))
+
+def insert_items(items):
+    """Insert a batch, continuing past bad documents; returns (inserted, [(index, error), ...])"""
+    try:
+        result = items_collection.insert_many(items, ordered=False)
+        return len(result.inserted_ids), []
+    except BulkWriteError as e:
+        failures = [(err['index'], err.get('errmsg', 'Write failed')) for err in e.details['writeErrors']]
+        return e.details['nInserted'], failures
+
 def get_item_by_id(item_id):
     """Get an item by ID"""
-    from bson import ObjectId
     return items_collection.find_one({"_id": ObjectId(item_id)})
 
+def get_items_by_ids(item_ids, projection=None):
+    """Items for many IDs in one $in query, in the order asked for; unknown IDs are left out"""
+    ids = object_ids(item_ids)
+    if not ids:
+        return []
+    found = {item['_id']: item for item in items_collection.find({"_id": {"$in": ids}}, projection)}
+    return [found[item_id] for item_id in ids if item_id in found]
+
+# ?embed= options: the user reference each one resolves and the name field it adds
+EMBEDS = {
+    "poster": ("user_id", "user_name"),
+    "claimer": ("claimed_by", "claimer_name")
+}
+
+def parse_embed(value):
+    """The embeds named in a ?embed= value"""
+    if not value:
+        return ()
+    embeds = tuple(name.strip() for name in value.split(',') if name.strip())
+    unknown = [name for name in embeds if name not in EMBEDS]
+    if unknown:
+        raise ValueError(f"Unknown embed: {unknown[0]}")
+    return embeds
+
+def embed_references(items, embeds):
+    """The user IDs the embeds refer to"""
+    references = (item.get(EMBEDS[name][0]) for item in items for name in embeds)
+    return [ref for ref in references if ref]
+
+def apply_user_names(items, embeds, names):
+    """Set each embed's name field from {user_id: name}"""
+    for item in items:
+        for name in embeds:
+            field, target = EMBEDS[name]
+            if field in item:
+                item[target] = names.get(str(item[field]))
+    return items
+
+def embed_users(items, embeds):
+    """Add user display names to items with one users query for the whole list"""
+    if not embeds or not items:
+        return items
+    return apply_user_names(items, embeds, get_user_names(embed_references(items, embeds)))
+
+def iter_embedding_users(cursor, embeds, batch_size):
+    """Stream a cursor with names embedded, one users query per batch_size documents"""
+    if not embeds:
+        yield from cursor
+        return
+    batch = []
+    for item in cursor:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield from embed_users(batch, embeds)
+            batch = []
+    yield from embed_users(batch, embeds)
+
 def get_items_by_user(user_id):
     """Get all items posted by a user"""
     return list(items_collection.find({"user_id": user_id}))
 
 def get_available_items():
     """Get all available items"""
-    return list(items_collection.find({"status": "approved"}))
\ No newline at end of file
+    return list(items_collection.find({"status": "approved"}))
+
+def moderate_items(decisions):
+    """Apply {ObjectId: status} decisions in one bulk_write.
+
+    Each update only applies if the item still has the status it was read
+    with, so a claim, expiry or single moderation that lands in between is
+    never overwritten. Returns (previous documents of the items updated,
+    ids of the items that changed underneath and were left alone).
+    """
+    # One read to learn which items exist (and their old status), one batched write
+    previous = {doc['_id']: doc for doc in items_collection.find({"_id": {"$in": list(decisions)}})}
+    now = datetime.utcnow()
+    operations = [UpdateOne({"_id": item_id, "status": doc.get("status")},
+                            {"$set": {"status": decisions[item_id], "moderated_at": now}})
+                  for item_id, doc in previous.items()]
+    if not operations:
+        return {}, set()
+    result = items_collection.bulk_write(operations, ordered=False)
+    if result.matched_count == len(operations):
+        return previous, set()
+    # Some items changed since the read: the ones this write stamped are the ones that applied
+    applied = {doc['_id'] for doc in items_collection.find(
+        {"_id": {"$in": list(previous)}, "moderated_at": now}, {"_id": 1})}
+    conflicts = set(previous) - applied
+    return {item_id: previous[item_id] for item_id in applied}, conflicts
+
+def _not_held_by_others(user_id, now):
+    """Filter matching items with no live reservation, or one held by user_id"""
+    return {"$or": [
+        {"reserved_until": {"$exists": False}},
+        {"reserved_until": {"$lte": now}},
+        {"reserved_by": user_id}
+    ]}
+
+def claim_item(item_id, user_id):
+    """Atomically claim an available item; returns the claimed item or None"""
+    now = datetime.utcnow()
+    # Status check and update happen in one operation, so only one claimer can win
+    return items_collection.find_one_and_update(
+        {"_id": ObjectId(item_id), "status": "approved", **_not_held_by_others(user_id, now)},
+        {"$set": {"status": "claimed", "claimed_by": user_id, "claimed_at": now},
+         "$unset": {"reserved_by": "", "reserved_until": ""}},
+        return_document=ReturnDocument.AFTER
+    )
+
+def reserve_item(item_id, user_id, hold_seconds):
+    """Hold an available item for user_id; returns the item or None if unavailable"""
+    now = datetime.utcnow()
+    return items_collection.find_one_and_update(
+        {"_id": ObjectId(item_id), "status": "approved", **_not_held_by_others(user_id, now)},
+        {"$set": {"reserved_by": user_id, "reserved_until": now + timedelta(seconds=hold_seconds)}},
+        return_document=ReturnDocument.AFTER
+    )
+
+def release_reservation(item_id, user_id):
+    """Drop user_id's hold on an item; returns the item, or None if there was no hold"""
+    return items_collection.find_one_and_update(
+        {"_id": ObjectId(item_id), "reserved_by": user_id},
+        {"$unset": {"reserved_by": "", "reserved_until": ""}},
+        return_document=ReturnDocument.AFTER
+    )
+
+def release_expired_reservations():
+    """Clear every hold that has run out; returns how many were released"""
+    # Expired holds already stop blocking claims; this just tidies the documents
+    result = items_collection.update_many(
+        {"reserved_until": {"$lte": datetime.utcnow()}},
+        {"$unset": {"reserved_by": "", "reserved_until": ""}}
+    )
+    return result.modified_count
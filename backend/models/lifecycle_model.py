@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+from pymongo import ReplaceOne
+from models.db import collection
+from models.item_model import items_collection, release_expired_reservations
+from utils import events
+from utils.scheduler import Job
+
+# Items that are done with (claimed, rejected, expired) move here, so the hot
+# items collection only holds what browse, moderation and claims still touch.
+items_archive_collection = collection('items_archive')
+
+ARCHIVED_STATUSES = ("claimed", "rejected", "expired")
+
+def _batches(query, batch_size, max_batches, projection=None):
+    """Up to max_batches lists of at most batch_size matching documents"""
+    for _ in range(max_batches):
+        batch = list(items_collection.find(query, projection).limit(batch_size))
+        if not batch:
+            return
+        yield batch
+
+def expire_items(app):
+    """Mark approved and pending items past their configured age as expired"""
+    config = app.config
+    now = datetime.utcnow()
+    counts = {}
+    for status, days in (("approved", config['ITEM_APPROVED_TTL_DAYS']),
+                         ("pending", config['ITEM_PENDING_TTL_DAYS'])):
+        expired = 0
+        query = {"status": status, "created_at": {"$lt": now - timedelta(days=days)}}
+        for batch in _batches(query, config['LIFECYCLE_BATCH_SIZE'], config['LIFECYCLE_MAX_BATCHES']):
+            ids = [item["_id"] for item in batch]
+            # The status condition skips anything claimed or moderated since we read it
+            result = items_collection.update_many(
+                {"_id": {"$in": ids}, "status": status},
+                # expired_from tells the rollup backfill which expired items had been approved
+                {"$set": {"status": "expired", "expired_at": now, "expired_from": status},
+                 "$unset": {"reserved_by": "", "reserved_until": ""}}
+            )
+            expired += result.modified_count
+            # Same signal as a bulk moderation, so listing caches, ETags and feeds follow along
+            events.items_moderated.send(app, items=batch, statuses={_id: "expired" for _id in ids})
+        counts[f"{status}_expired"] = expired
+    return counts
+
+def archive_items(app):
+    """Move finished items older than ITEM_ARCHIVE_AFTER_DAYS to items_archive, in bounded batches"""
+    config = app.config
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=config['ITEM_ARCHIVE_AFTER_DAYS'])
+    query = {"$or": [
+        {"status": "claimed", "claimed_at": {"$lt": cutoff}},
+        {"status": "expired", "expired_at": {"$lt": cutoff}},
+        {"status": "rejected", "created_at": {"$lt": cutoff}}
+    ]}
+    archived = 0
+    for batch in _batches(query, config['LIFECYCLE_BATCH_SIZE'], config['LIFECYCLE_MAX_BATCHES']):
+        # Upserts, so a copy left behind by a run that died before its delete is simply replaced
+        items_archive_collection.bulk_write(
+            [ReplaceOne({"_id": item["_id"]}, dict(item, archived_at=now), upsert=True) for item in batch],
+            ordered=False
+        )
+        # Only delete what is still finished, in case an admin moved it back meanwhile
+        result = items_collection.delete_many({"_id": {"$in": [item["_id"] for item in batch]},
+                                               "status": {"$in": list(ARCHIVED_STATUSES)}})
+        archived += result.deleted_count
+        # Detail and nearby responses for these items must stop revalidating as unchanged
+        events.items_archived.send(app, items=batch)
+    return {"archived": archived}
+
+def get_items_by_user(user_id, projection=None):
+    """A user's items, newest first, followed by their archived ones"""
+    live = list(items_collection.find({"user_id": user_id}, projection).sort("created_at", -1))
+    archived = list(items_archive_collection.find({"user_id": user_id}, projection).sort("created_at", -1))
+    return live + archived
+
+def release_reservations(app):
+    """Tidy holds that have run out"""
+    return {"released": release_expired_reservations()}
+
+def lifecycle_jobs(config):
+    """The scheduled jobs, with intervals from config"""
+    return [
+        Job("release-reservations", config['RESERVATION_SWEEP_SECONDS'], release_reservations),
+        Job("expire-items", config['LIFECYCLE_INTERVAL_SECONDS'], expire_items),
+        Job("archive-items", config['LIFECYCLE_INTERVAL_SECONDS'], archive_items)
+    ]
@@ -0,0 +1,195 @@
+import click
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from models.db import collection
+from models.user_model import users_collection
+from models.item_model import items_collection
+from models.lifecycle_model import items_archive_collection
+from utils import events
+
+# Hourly and daily counters for the admin trend charts, one document per
+# granularity and bucket:
+#   {"_id": "day:2026-10-18T00:00:00", "granularity": "day", "bucket": <datetime>,
+#    "signups": 3, "posts": 12, "posts_by_category": {"books": 4, ...},
+#    "approvals": 9, "claims": 5}
+# The write paths $inc the current hour and day, so a chart reads one small
+# document per bucket no matter how many users and items there are.
+rollups_collection = collection('rollups')
+
+METRICS = ("signups", "posts", "approvals", "claims")
+
+def _hour(at):
+    return at.replace(minute=0, second=0, microsecond=0)
+
+def _day(at):
+    return at.replace(hour=0, minute=0, second=0, microsecond=0)
+
+GRANULARITIES = {
+    "hour": (_hour, timedelta(hours=1)),
+    "day": (_day, timedelta(days=1))
+}
+
+def _category_field(category):
+    if category is None:
+        return None
+    category = str(category)
+    # Field names can't contain dots or start with $; those only count toward the total
+    if not category or '.' in category or category.startswith('$'):
+        return None
+    return f"posts_by_category.{category}"
+
+def _rollup_id(granularity, bucket):
+    return f"{granularity}:{bucket.isoformat()}"
+
+def record(increments, at=None):
+    """Add increments to the hour and day buckets containing `at` (default now), in one round trip"""
+    at = at or datetime.utcnow()
+    operations = []
+    for granularity, (truncate, _) in GRANULARITIES.items():
+        bucket = truncate(at)
+        operations.append(UpdateOne(
+            {"_id": _rollup_id(granularity, bucket)},
+            {"$inc": increments, "$setOnInsert": {"granularity": granularity, "bucket": bucket}},
+            upsert=True
+        ))
+    rollups_collection.bulk_write(operations, ordered=False)
+
+def _post_increments(categories):
+    increments = {"posts": sum(categories.values())}
+    for category, count in categories.items():
+        field = _category_field(category)
+        if field:
+            increments[field] = increments.get(field, 0) + count
+    return increments
+
+def timeseries(metric, granularity, start, end, category=None):
+    """[(bucket, value)] for every bucket in [start, end), zeros included"""
+    truncate, step = GRANULARITIES[granularity]
+    field = metric
+    if category is not None:
+        field = _category_field(category)
+        if field is None:
+            raise ValueError(f"Invalid category: {category}")
+    docs = rollups_collection.find(
+        {"granularity": granularity, "bucket": {"$gte": truncate(start), "$lt": end}},
+        {"bucket": 1, field: 1}
+    )
+    values = {}
+    for doc in docs:
+        value = doc
+        for part in field.split('.'):
+            value = value.get(part, 0) if isinstance(value, dict) else 0
+        values[doc["bucket"]] = value
+    points = []
+    bucket = truncate(start)
+    while bucket < end:
+        points.append((bucket, values.get(bucket, 0)))
+        bucket += step
+    return points
+
+def bucket_count(granularity, start, end):
+    truncate, step = GRANULARITIES[granularity]
+    return max(0, -(-(end - truncate(start)) // step))
+
+# Backfill: the same numbers recomputed from the documents themselves
+
+_FORMATS = {"hour": "%Y-%m-%dT%H:00:00", "day": "%Y-%m-%dT00:00:00"}
+
+def _grouped(source, match, time_field, granularity, extra_key=None):
+    key = {"t": {"$dateToString": {"format": _FORMATS[granularity], "date": time_field}}}
+    if extra_key:
+        key["k"] = extra_key
+    pipeline = [{"$match": match}, {"$group": {"_id": key, "n": {"$sum": 1}}}]
+    for row in source.aggregate(pipeline):
+        yield datetime.fromisoformat(row["_id"]["t"]), row["_id"].get("k"), row["n"]
+
+def backfill(cutoff=None):
+    """Rebuild every rollup before cutoff (default: today, UTC) from the data.
+
+    Buckets from the cutoff on are left to the live counters, so the
+    command is safe to run while the app takes writes. Approvals use
+    moderated_at where it was recorded and created_at for items moderated
+    before it was, counting items that ever got approved: approved or
+    claimed ones, and expired ones that were approved when they expired
+    (expired_from, or moderated_at for items expired before that field).
+    Returns the number of bucket documents written.
+    """
+    cutoff = cutoff or _day(datetime.utcnow())
+    docs = {}
+
+    def add(granularity, bucket, field, n):
+        doc = docs.setdefault(_rollup_id(granularity, bucket), {
+            "_id": _rollup_id(granularity, bucket), "granularity": granularity, "bucket": bucket})
+        if '.' in field:
+            parent, child = field.split('.', 1)
+            doc.setdefault(parent, {})
+            doc[parent][child] = doc[parent].get(child, 0) + n
+        else:
+            doc[field] = doc.get(field, 0) + n
+
+    for granularity in GRANULARITIES:
+        for bucket, _, n in _grouped(users_collection, {"created_at": {"$lt": cutoff}},
+                                     "$created_at", granularity):
+            add(granularity, bucket, "signups", n)
+        for source in (items_collection, items_archive_collection):
+            for bucket, category, n in _grouped(source, {"created_at": {"$lt": cutoff}},
+                                                "$created_at", granularity, "$category"):
+                add(granularity, bucket, "posts", n)
+                field = _category_field(category)
+                if field:
+                    add(granularity, bucket, field, n)
+            approved_at = {"$ifNull": ["$moderated_at", "$created_at"]}
+            for bucket, _, n in _grouped(source, {"$or": [{"status": {"$in": ["approved", "claimed"]}},
+                                                          {"status": "expired", "$or": [
+                                                              {"expired_from": "approved"},
+                                                              {"expired_from": {"$exists": False},
+                                                               "moderated_at": {"$exists": True}}]}],
+                                                  "created_at": {"$ne": None},
+                                                  "$expr": {"$lt": [approved_at, cutoff]}},
+                                         approved_at, granularity):
+                add(granularity, bucket, "approvals", n)
+            for bucket, _, n in _grouped(source, {"claimed_at": {"$lt": cutoff}},
+                                         "$claimed_at", granularity):
+                add(granularity, bucket, "claims", n)
+
+    # Everything before the cutoff is replaced; later buckets keep counting live
+    rollups_collection.delete_many({"bucket": {"$lt": cutoff}})
+    if docs:
+        rollups_collection.insert_many(list(docs.values()), ordered=False)
+    return len(docs)
+
+def init_app(app):
+    """Register the `flask backfill-rollups` command"""
+    @app.cli.command('backfill-rollups')
+    def backfill_rollups():
+        """Rebuild the analytics rollups from existing users and items"""
+        written = backfill()
+        click.echo(f"Wrote {written} rollup buckets")
+
+@events.user_registered.connect
+def _on_user_registered(sender, user, **extra):
+    record({"signups": 1})
+
+@events.item_created.connect
+def _on_item_created(sender, item, **extra):
+    record(_post_increments({item.get("category"): 1}))
+
+@events.items_imported.connect
+def _on_items_imported(sender, count, categories=None, **extra):
+    record(_post_increments(categories) if categories else {"posts": count})
+
+@events.item_moderated.connect
+def _on_item_moderated(sender, item, status, **extra):
+    if status == "approved" and item.get("status") != "approved":
+        record({"approvals": 1})
+
+@events.items_moderated.connect
+def _on_items_moderated(sender, items, statuses, **extra):
+    approvals = sum(1 for item in items
+                    if statuses[item["_id"]] == "approved" and item.get("status") != "approved")
+    if approvals:
+        record({"approvals": approvals})
+
+@events.item_claimed.connect
+def _on_item_claimed(sender, item, **extra):
+    record({"claims": 1})
@@ -1,18 +1,15 @@
-from pymongo import MongoClient
 from datetime import datetime
-from werkzeug.security import generate_password_hash
-from config import Config
+from bson import ObjectId
+from bson.errors import InvalidId
+from models.db import collection
 
-# Initialize MongoDB client
-client = MongoClient(Config.MONGODB_URI)
-db = client.get_default_database()
-users_collection = db.users
+users_collection = collection('users')
 
-def create_user(email, password, name, role="user"):
-    """Create a new user in the database"""
+def create_user(email, password_hash, name, role="user"):
+    """Create a new user in the database (hash the password with utils.passwords first)"""
     user = {
         "email": email,
-        "password": generate_password_hash(password),
+        "password": password_hash,
         "name": name,
         "role": role,
         "active": True,
@@ -27,5 +24,37 @@ def get_user_by_email(email):
 
 def get_user_by_id(user_id):
     """Get a user by ID"""
-    from bson import ObjectId
-    return users_collection.find_one({"_id": ObjectId(user_id)})
\ No newline at end of file
+    return users_collection.find_one({"_id": ObjectId(user_id)})
+
+def object_ids(ids):
+    """The distinct valid ObjectIds among ids (strings or ObjectIds), in order; invalid ones are skipped"""
+    seen = {}
+    for value in ids:
+        try:
+            seen.setdefault(ObjectId(value), None)
+        except (InvalidId, TypeError):
+            pass
+    return list(seen)
+
+def get_users_by_ids(user_ids, projection=None):
+    """Users for many IDs in one $in query; returns {str(_id): user}"""
+    ids = object_ids(user_ids)
+    if not ids:
+        return {}
+    # Never hand out password hashes from a batch lookup
+    projection = projection or {"password": 0}
+    return {str(user['_id']): user for user in users_collection.find({"_id": {"$in": ids}}, projection)}
+
+def user_names_query(user_ids):
+    """(filter, projection) looking up display names for user_ids, or None if none is valid"""
+    ids = object_ids(user_ids)
+    return ({"_id": {"$in": ids}}, {"name": 1}) if ids else None
+
+def names_by_id(users):
+    """{user_id: name} from the documents user_names_query finds"""
+    return {str(user['_id']): user.get('name') for user in users}
+
+def get_user_names(user_ids):
+    """Display names for many user IDs in one query; returns {user_id: name}"""
+    query = user_names_query(user_ids)
+    return names_by_id(users_collection.find(*query)) if query else {}
\ No newline at end of file
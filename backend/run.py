@@ -1,6 +1,13 @@
 from app import create_app
+from config import Config
 
 app = create_app()
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    if Config.SERVER_MODE == "asgi":
+        # Async item routes on AsyncMongoClient, everything else through WSGI (see asgi.py)
+        import uvicorn
+        uvicorn.run("asgi:create_asgi_app", factory=True, host=Config.SERVER_HOST,
+                    port=Config.SERVER_PORT, workers=Config.SERVER_WORKERS)
+    else:
+        app.run(debug=True)
@@ -1,15 +1,47 @@
-from flask import session
+from flask import session, g
 from models.user_model import users_collection
 from bson import ObjectId
+from config import Config
+from utils.cache import LRUCache
+from utils import events
+
+_MISSING = object()
+
+# Process-wide principal cache: user_id -> user document (without password).
+# Entries live for PRINCIPAL_CACHE_TTL seconds, so a role change made through
+# another worker process is picked up within that window at the latest.
+principal_cache = LRUCache(maxsize=Config.PRINCIPAL_CACHE_SIZE, ttl=Config.PRINCIPAL_CACHE_TTL)
+
+def _load_principal(user_id):
+    """Look up a user, memoized for the request (flask.g) and across requests"""
+    principals = g.setdefault('principals', {})
+    if user_id in principals:
+        return principals[user_id]
+    
+    user = principal_cache.get(user_id, _MISSING)
+    if user is _MISSING:
+        user = users_collection.find_one({"_id": ObjectId(user_id)}, {"password": 0})
+        principal_cache.set(user_id, user)
+    
+    principals[user_id] = user
+    return user
+
+def invalidate_principal(user_id):
+    """Forget any cached copy of a user, e.g. after a role or active change"""
+    principal_cache.delete(user_id)
+    g.get('principals', {}).pop(user_id, None)
+
+@events.user_updated.connect
+def _on_user_updated(sender, user_id, **extra):
+    invalidate_principal(user_id)
 
 def is_admin(session):
     """Check if the current session belongs to an admin user"""
     if 'admin' not in session:
         return False
     
-    admin_id = session.get('admin')
-    admin = users_collection.find_one({"_id": ObjectId(admin_id), "role": "admin"})
-    return admin is not None
+    admin = _load_principal(session.get('admin'))
+    return admin is not None and admin.get('role') == "admin"
 
 def get_current_user_id(session):
     """Get the current user ID from session"""
@@ -21,4 +53,6 @@ def get_current_user(session):
     if not user_id:
         return None
     
-    return users_collection.find_one({"_id": ObjectId(user_id)})
+    user = _load_principal(user_id)
+    # Hand out a copy so callers can't modify the cached document
+    return dict(user) if user else None
@@ -0,0 +1,275 @@
+import asyncio
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from flask import Response, current_app, request
+from pymongo.errors import PyMongoError
+from models.item_model import items_collection, CARD_FIELDS
+from utils import events
+
+logger = logging.getLogger(__name__)
+
+# Live item events for GET /api/items/events and /api/admin/events (Server-Sent Events).
+# Writes reach the broker either from the write-path signals (this worker's
+# writes only) or from a MongoDB change stream (every worker's writes, needs
+# a replica set); EVENTS_SOURCE picks one. Each event is encoded once and
+# handed to every subscriber's bounded queue; a subscriber whose queue is full
+# is evicted rather than buffered for, and reconnects with Last-Event-ID.
+
+class Event:
+    __slots__ = ("id", "name", "public", "data")
+
+    def __init__(self, id, name, public, data):
+        self.id = id
+        self.name = name
+        self.public = public
+        self.data = data
+
+    def encode(self):
+        return f"id: {self.id}\nevent: {self.name}\ndata: {self.data}\n\n"
+
+class Subscription:
+    """One client's bounded queue of pending events"""
+
+    def __init__(self, maxsize, admin):
+        self.maxsize = maxsize
+        self.admin = admin
+        self.events = deque()
+        self.closed = False
+
+    def wants(self, event):
+        return self.admin or event.public
+
+    def offer(self, event):
+        """Queue an event; False if the queue is full (the broker then evicts us)"""
+        if len(self.events) >= self.maxsize:
+            return False
+        self.events.append(event)
+        self._wake()
+        return True
+
+    def close(self):
+        self.closed = True
+        self._wake()
+
+    def drain(self):
+        events = []
+        while self.events:
+            events.append(self.events.popleft())
+        return events
+
+class ThreadSubscription(Subscription):
+    """Subscription read by a WSGI worker thread"""
+
+    def __init__(self, maxsize, admin):
+        super().__init__(maxsize, admin)
+        self._ready = threading.Condition()
+
+    def _wake(self):
+        with self._ready:
+            self._ready.notify()
+
+    def get(self, timeout):
+        """Pending events, waiting up to timeout seconds; [] on timeout"""
+        with self._ready:
+            if not self.events and not self.closed:
+                self._ready.wait(timeout)
+        return self.drain()
+
+class AsyncSubscription(Subscription):
+    """Subscription read by a coroutine; publishers may be on any thread"""
+
+    def __init__(self, maxsize, admin, loop):
+        super().__init__(maxsize, admin)
+        self._loop = loop
+        self._ready = asyncio.Event()
+
+    def _wake(self):
+        self._loop.call_soon_threadsafe(self._ready.set)
+
+    async def get(self, timeout):
+        if not self.events and not self.closed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._ready.clear()
+        return self.drain()
+
+class BrokerFull(Exception):
+    """Raised when the subscriber limit is reached"""
+
+class Broker:
+    """In-process fan-out of item events to SSE subscribers"""
+
+    def __init__(self, history=256):
+        self._subscribers = set()
+        self._recent = deque(maxlen=history)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.max_subscribers = 10000
+        self.queue_size = 100
+        self.dumps = None
+        self.evictions = 0
+        self.watch = None
+        self._watch_pid = None
+
+    def configure(self, dumps, queue_size, max_subscribers, watch=None):
+        self.dumps = dumps
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.watch = watch
+
+    def _ensure_watching(self):
+        # Threads don't survive fork, so each worker starts its own watcher on first use
+        if self.watch and self._watch_pid != os.getpid():
+            self._watch_pid = os.getpid()
+            threading.Thread(target=self.watch, name="item-change-stream", daemon=True).start()
+
+    def publish(self, name, payload, public=True):
+        """Encode an event once and queue it for every interested subscriber"""
+        if self.dumps is None:
+            return
+        with self._lock:
+            event = Event(next(self._ids), name, public, self.dumps(payload))
+            self._recent.append(event)
+            slow = [s for s in self._subscribers if s.wants(event) and not s.offer(event)]
+            for subscription in slow:
+                self._subscribers.discard(subscription)
+                subscription.close()
+            self.evictions += len(slow)
+
+    def subscribe(self, subscription, last_event_id=None):
+        """Register a subscription, first queueing what it missed since last_event_id"""
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise BrokerFull()
+            self._ensure_watching()
+            if last_event_id is not None:
+                for event in self._recent:
+                    if event.id > last_event_id and subscription.wants(event):
+                        subscription.offer(event)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stats(self):
+        with self._lock:
+            return {"subscribers": len(self._subscribers), "evictions": self.evictions,
+                    "last_event_id": self._recent[-1].id if self._recent else 0}
+
+broker = Broker()
+
+def parse_last_event_id(value):
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+def card(item, **changes):
+    """The part of an item the browse grid renders"""
+    doc = {"_id": item["_id"], **{field: item[field] for field in CARD_FIELDS if field in item}}
+    doc.update(changes)
+    return doc
+
+def sse_stream(subscription, keepalive):
+    """SSE body for a ThreadSubscription; ends when the subscriber is evicted"""
+    try:
+        # Tell EventSource how soon to reconnect after an eviction
+        yield "retry: 2000\n\n"
+        while not subscription.closed:
+            pending = subscription.get(keepalive)
+            if pending:
+                yield "".join(event.encode() for event in pending)
+            else:
+                yield ": keepalive\n\n"
+    finally:
+        broker.unsubscribe(subscription)
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Don't let a reverse proxy buffer the stream
+    "X-Accel-Buffering": "no"
+}
+
+def event_stream(admin=False):
+    """SSE response for the current request; raises BrokerFull at the subscriber limit"""
+    subscription = broker.subscribe(ThreadSubscription(broker.queue_size, admin),
+                                    parse_last_event_id(request.headers.get('Last-Event-ID')))
+    keepalive = current_app.config['EVENTS_KEEPALIVE_SECONDS']
+    return Response(sse_stream(subscription, keepalive), mimetype='text/event-stream', headers=SSE_HEADERS)
+
+def _publish_moderated(item, status):
+    if status == "approved":
+        broker.publish("item-approved", card(item, status=status))
+    else:
+        broker.publish("item-moderated", {"_id": item["_id"], "status": status}, public=False)
+
+def _from_signals(sender):
+    return sender.config['EVENTS_SOURCE'] == 'signals'
+
+@events.item_created.connect
+def _on_item_created(sender, item, **extra):
+    if _from_signals(sender):
+        broker.publish("item-created", card(item), public=item.get("status") == "approved")
+
+@events.item_moderated.connect
+def _on_item_moderated(sender, item, status, **extra):
+    if _from_signals(sender):
+        _publish_moderated(item, status)
+
+@events.items_moderated.connect
+def _on_items_moderated(sender, items, statuses, **extra):
+    # A bulk moderation or expiry run can touch thousands of items: one event per
+    # batch, not per item, so it can't overflow every subscriber's queue at once
+    if not _from_signals(sender):
+        return
+    approved = [card(item, status="approved") for item in items if statuses[item["_id"]] == "approved"]
+    others = [{"_id": item["_id"], "status": statuses[item["_id"]]}
+              for item in items if statuses[item["_id"]] != "approved"]
+    if approved:
+        broker.publish("items-approved", {"items": approved})
+    if others:
+        broker.publish("items-moderated", {"items": others}, public=False)
+
+@events.item_claimed.connect
+def _on_item_claimed(sender, item, **extra):
+    if _from_signals(sender):
+        broker.publish("item-claimed", {"_id": item["_id"], "status": "claimed"})
+
+def _watch_items():
+    """Publish item events from the items change stream, resuming after errors"""
+    pipeline = [{"$match": {"$or": [
+        {"operationType": "insert"},
+        {"operationType": "update", "updateDescription.updatedFields.status": {"$exists": True}}
+    ]}}]
+    resume_after = None
+    while True:
+        try:
+            with items_collection.watch(pipeline, full_document="updateLookup",
+                                        resume_after=resume_after) as stream:
+                for change in stream:
+                    resume_after = stream.resume_token
+                    item = change.get("fullDocument")
+                    if item is None:
+                        continue
+                    if change["operationType"] == "insert":
+                        broker.publish("item-created", card(item), public=item.get("status") == "approved")
+                    elif item.get("status") == "claimed":
+                        broker.publish("item-claimed", {"_id": item["_id"], "status": "claimed"})
+                    else:
+                        _publish_moderated(item, item.get("status"))
+        except PyMongoError as e:
+            logger.warning("Item change stream failed, retrying: %s", e)
+            time.sleep(5)
+
+def init_app(app):
+    """Configure the broker; with EVENTS_SOURCE=change_stream it watches items once someone subscribes"""
+    broker.configure(app.json.dumps, app.config['EVENTS_QUEUE_SIZE'], app.config['EVENTS_MAX_SUBSCRIBERS'],
+                     watch=_watch_items if app.config['EVENTS_SOURCE'] == 'change_stream' else None)
@@ -0,0 +1,109 @@
+import csv
+import json
+
+class RowError(ValueError):
+    """A row that could not be parsed or validated"""
+
+MAX_LINE_BYTES = 1024 * 1024
+
+def _lines(stream, max_line_bytes):
+    """Yield each line decoded, or a RowError for a line that is too long or not UTF-8.
+
+    Lines are read with a size limit, so one huge line is skipped in chunks
+    instead of being read into memory whole.
+    """
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        newline = b'\n' if isinstance(line, bytes) else '\n'
+        if len(line) > max_line_bytes and not line.endswith(newline):
+            while line and not line.endswith(newline):
+                line = stream.readline(64 * 1024)
+            yield RowError(f"Line is longer than {max_line_bytes} bytes")
+            continue
+        if isinstance(line, bytes):
+            try:
+                line = line.decode('utf-8-sig')
+            except UnicodeDecodeError:
+                yield RowError("Invalid UTF-8")
+                continue
+        yield line
+
+def read_ndjson(stream, max_line_bytes=MAX_LINE_BYTES):
+    """Yield (row number, dict or RowError) for each non-blank NDJSON line"""
+    for number, line in enumerate(_lines(stream, max_line_bytes), start=1):
+        if isinstance(line, RowError):
+            yield number, line
+            continue
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as e:
+            yield number, RowError(f"Invalid JSON: {e}")
+
+def read_csv(stream, max_line_bytes=MAX_LINE_BYTES):
+    """Yield (row number, dict or RowError) for each CSV data row; the first line is the header"""
+    unreadable = []
+    line_number = [0]
+
+    def readable_lines():
+        # Rows are numbered by line after the header; lines that can't be read are reported and left out
+        for number, line in enumerate(_lines(stream, max_line_bytes)):
+            if isinstance(line, RowError):
+                unreadable.append((number, line))
+            else:
+                line_number[0] = number
+                yield line
+
+    for row in csv.DictReader(readable_lines()):
+        yield from unreadable
+        unreadable.clear()
+        # Empty cells count as absent, so they fail the same required-field check as JSON
+        yield line_number[0], {k: v for k, v in row.items() if k and v not in (None, '')}
+    yield from unreadable
+
+READERS = {
+    "ndjson": read_ndjson,
+    "csv": read_csv
+}
+
+def import_rows(rows, build, insert, batch_size=1000, max_errors=1000):
+    """Validate rows with build() and insert them with insert() in batches.
+    
+    Only one batch is held in memory at a time, and at most max_errors
+    error entries are kept. Returns (inserted count, errors, error count).
+    """
+    inserted, errors, error_count = 0, [], 0
+    batch, batch_rows = [], []
+
+    def record(row, message):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < max_errors:
+            errors.append({"row": row, "error": message})
+
+    def flush():
+        nonlocal inserted
+        count, failures = insert(batch)
+        inserted += count
+        for index, message in failures:
+            record(batch_rows[index], message)
+        batch.clear()
+        batch_rows.clear()
+
+    for number, data in rows:
+        try:
+            if isinstance(data, RowError):
+                raise data
+            batch.append(build(data))
+            batch_rows.append(number)
+        except ValueError as e:
+            record(number, str(e))
+            continue
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return inserted, errors, error_count
@@ -0,0 +1,149 @@
+import hashlib
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+from flask import request, make_response, current_app, g
+from pymongo import ReturnDocument
+from models.db import collection
+from utils import events
+
+# A single counter that moves whenever anything visible in the item catalog
+# changes. Listing and detail responses derive their ETag from it, so a client
+# revalidating an unchanged page gets a 304 without the items collection being read.
+#
+# The same document keeps per-listing generations under "listings": one per
+# category, "*" for the unfiltered listing and "names" for embedded poster
+# names. Only writes that change what a listing shows move them, and the
+# listing cache keys pages on them (see utils/response_cache.py), so a write
+# to one category leaves every other category's cached pages in use. Because
+# ETag and generations are read from one snapshot of one shared document,
+# a cached page and its ETag agree in every worker.
+meta_collection = collection('meta')
+CATALOG_ID = "catalog"
+ALL_LISTINGS = "*"
+POSTER_NAMES = "names"
+
+_local = {"version": None, "updated_at": None, "listings": {}, "read_at": 0.0}
+_lock = threading.Lock()
+
+def _listing_field(category):
+    # Categories are free text; hash them so dots and $ are safe in a field name
+    return hashlib.sha1(str(category).encode()).hexdigest()[:16]
+
+def _remember(doc):
+    with _lock:
+        # Only move forward: a read that started before a concurrent bump() in this
+        # worker may finish after it, and must not roll the version back
+        if doc.get("version", 0) >= (_local["version"] or 0):
+            _local["version"] = doc.get("version", 0)
+            _local["updated_at"] = doc.get("updated_at") or datetime.utcnow()
+            _local["listings"] = doc.get("listings") or {}
+        _local["read_at"] = time.monotonic()
+        return _local["version"], _local["updated_at"], _local["listings"]
+
+def _fresh(max_age):
+    with _lock:
+        if _local["version"] is not None and time.monotonic() - _local["read_at"] < max_age:
+            return _local["version"], _local["updated_at"], _local["listings"]
+    return None
+
+def current_version(max_age):
+    """(version, updated_at, listing generations) of the catalog, re-read at most every max_age seconds"""
+    return _fresh(max_age) or _remember(meta_collection.find_one({"_id": CATALOG_ID}) or {})
+
+async def current_version_async(db, max_age):
+    """current_version for async views, reading through an async database handle"""
+    return _fresh(max_age) or _remember(await db.meta.find_one({"_id": CATALOG_ID}) or {})
+
+def listing_generation(listings, category, embeds=()):
+    """The generation a cached page of one listing is keyed on"""
+    generation = listings.get(_listing_field(category) if category else ALL_LISTINGS, 0)
+    return [generation, listings.get(POSTER_NAMES, 0)] if embeds else generation
+
+def make_etag(version, full_path):
+    """ETag for one request path under one catalog version"""
+    return hashlib.sha1(f"{version}:{full_path}".encode()).hexdigest()[:20]
+
+def is_not_modified(etag, updated_at, if_none_match, if_modified_since):
+    """Whether the client's validators (Werkzeug ETags / datetime) still match"""
+    if if_none_match:
+        return if_none_match.contains_weak(etag)
+    return (if_modified_since is not None
+            and updated_at.replace(microsecond=0) <= if_modified_since.replace(tzinfo=None))
+
+def bump(categories=(), names=False):
+    """Advance the catalog version after a write, and the generations of the listings it changed"""
+    increments = {"version": 1}
+    if categories:
+        increments[f"listings.{ALL_LISTINGS}"] = 1
+        for category in set(categories):
+            if category is not None:
+                increments[f"listings.{_listing_field(category)}"] = 1
+    if names:
+        increments[f"listings.{POSTER_NAMES}"] = 1
+    doc = meta_collection.find_one_and_update(
+        {"_id": CATALOG_ID},
+        {"$inc": increments, "$set": {"updated_at": datetime.utcnow().replace(microsecond=0)}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return _remember(doc)
+
+# Listings only show approved items. A new pending item has no response a
+# client could hold an ETag for, so it moves nothing; holds, archives and
+# moderation between hidden statuses only change detail and nearby responses.
+
+@events.item_created.connect
+def _on_item_created(sender, item, **extra):
+    if item.get("status") == "approved":
+        bump([item.get("category")])
+
+@events.items_imported.connect
+def _on_items_imported(sender, categories, status, **extra):
+    if status == "approved":
+        bump(categories)
+
+@events.item_moderated.connect
+def _on_item_moderated(sender, item, status, **extra):
+    listed = "approved" in (item.get("status"), status)
+    bump([item.get("category")] if listed else ())
+
+@events.items_moderated.connect
+def _on_items_moderated(sender, items, statuses, **extra):
+    bump([item.get("category") for item in items
+          if "approved" in (item.get("status"), statuses.get(item["_id"]))])
+
+@events.item_claimed.connect
+def _on_item_claimed(sender, item, **extra):
+    bump([item.get("category")])
+
+@events.items_archived.connect
+@events.item_reservation_changed.connect
+def _on_item_changed(sender, **extra):
+    bump()
+
+@events.user_updated.connect
+def _on_user_updated(sender, updates, **extra):
+    # Item responses can embed poster names (?embed=poster)
+    if "name" in updates:
+        bump(names=True)
+
+def conditional(view):
+    """Answer If-None-Match/If-Modified-Since from the catalog version, before running the view"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        version, updated_at, listings = current_version(current_app.config['CATALOG_VERSION_MAX_AGE'])
+        etag = make_etag(version, request.full_path)
+        # The view keys cached bodies on generations from the same snapshot, so body and ETag always agree
+        g.catalog_listings = listings
+        not_modified = is_not_modified(etag, updated_at, request.if_none_match, request.if_modified_since)
+        
+        response = make_response('', 304) if not_modified else make_response(view(*args, **kwargs))
+        if response.status_code in (200, 304):
+            response.set_etag(etag, weak=True)
+            response.last_modified = updated_at
+            # Let browsers keep the body but always revalidate
+            response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
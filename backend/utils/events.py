@@ -0,0 +1,26 @@
+from blinker import Namespace
+
+# Write-path signals. Controllers send these after a successful write so that
+# caches, counters and feeds can react without the controllers knowing about them.
+# The sender is always the Flask app.
+_signals = Namespace()
+
+# item=<new item document>
+item_created = _signals.signal('item-created')
+# count=<number of items inserted by one bulk import>, categories=<{category: items inserted}>,
+# status=<status the items were imported with>
+items_imported = _signals.signal('items-imported')
+# item=<item document before the change>, status=<new status>
+item_moderated = _signals.signal('item-moderated')
+# items=<item documents before the change>, statuses=<{item _id: new status}>; one bulk moderation
+items_moderated = _signals.signal('items-moderated')
+# items=<item documents moved to items_archive by one lifecycle batch>
+items_archived = _signals.signal('items-archived')
+# item=<claimed item document>, user_id=<claimer>
+item_claimed = _signals.signal('item-claimed')
+# item_id=<id>, user_id=<holder>; sent when a hold is placed or released
+item_reservation_changed = _signals.signal('item-reservation-changed')
+# user=<new user document>
+user_registered = _signals.signal('user-registered')
+# user_id=<id>, updates=<dict of changed fields>
+user_updated = _signals.signal('user-updated')
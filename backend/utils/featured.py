@@ -0,0 +1,115 @@
+import math
+import threading
+import time
+from datetime import datetime
+from models.item_model import items_collection, CARD_FIELDS
+from utils.pagination import ITEM_SORT
+from utils import events
+
+# The home page's featured items, ranked ahead of time and kept in memory as
+# pre-encoded JSON, so GET /api/items/featured never touches the database.
+# The ranking is rebuilt in the background when it is older than its
+# refresh interval or a write made it stale; readers keep getting the
+# previous ranking until the new one is ready.
+
+class FeaturedRanking:
+    """Recent, available items with the categories spread out"""
+
+    def __init__(self, size=12, candidates=200, half_life_hours=72, repeat_penalty=0.5):
+        self.size = size
+        self.candidates = candidates
+        self.half_life = half_life_hours * 3600
+        self.repeat_penalty = repeat_penalty
+        self.refresh_seconds = 60
+        self.dumps = None
+        self._encoded = None
+        self._built_at = 0.0
+        self._stale = True
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._first_build = threading.Lock()
+
+    def configure(self, dumps, size, refresh_seconds):
+        self.dumps = dumps
+        self.size = size
+        self.refresh_seconds = refresh_seconds
+
+    def rank(self, items, now):
+        """Pick up to `size` items, trading recency against repeating a category"""
+        def recency(item):
+            created_at = item.get('created_at')
+            age = (now - created_at).total_seconds() if created_at else self.half_life * 10
+            return math.pow(0.5, max(age, 0) / self.half_life)
+
+        remaining = [(recency(item), item) for item in items]
+        picked_per_category = {}
+        ranked = []
+        while remaining and len(ranked) < self.size:
+            best = max(range(len(remaining)), key=lambda i: remaining[i][0] * math.pow(
+                self.repeat_penalty, picked_per_category.get(remaining[i][1].get('category'), 0)))
+            _, item = remaining.pop(best)
+            category = item.get('category')
+            picked_per_category[category] = picked_per_category.get(category, 0) + 1
+            ranked.append(item)
+        return ranked
+
+    def build(self):
+        """Query the newest available items and rank them"""
+        now = datetime.utcnow()
+        # Unclaimed, and not on hold for someone right now
+        query = {"status": "approved", "$or": [{"reserved_until": {"$exists": False}},
+                                               {"reserved_until": {"$lte": now}}]}
+        projection = {field: 1 for field in CARD_FIELDS}
+        items = list(items_collection.find(query, projection).sort(ITEM_SORT).limit(self.candidates))
+        return [self.dumps(item) for item in self.rank(items, now)]
+
+    def _store(self):
+        encoded = self.build()
+        with self._lock:
+            self._encoded = encoded
+            self._built_at = time.monotonic()
+
+    def _refresh(self):
+        try:
+            self._store()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def mark_stale(self):
+        self._stale = True
+
+    def get(self, limit):
+        """JSON array of the top `limit` featured items"""
+        with self._lock:
+            encoded = self._encoded
+            due = self._stale or time.monotonic() - self._built_at > self.refresh_seconds
+            start = encoded is not None and due and not self._refreshing
+            if start:
+                self._refreshing = True
+                self._stale = False
+        if encoded is None:
+            # Nothing to serve yet: the first requests wait for one build
+            with self._first_build:
+                if self._encoded is None:
+                    self._stale = False
+                    self._store()
+            encoded = self._encoded
+        elif start:
+            threading.Thread(target=self._refresh, name="featured-refresh", daemon=True).start()
+        return "[" + ",".join(encoded[:limit]) + "]"
+
+featured = FeaturedRanking()
+
+def init_app(app):
+    featured.configure(app.json.dumps, app.config['FEATURED_ITEMS_MAX'],
+                       app.config['FEATURED_REFRESH_SECONDS'])
+
+@events.item_created.connect
+@events.items_imported.connect
+@events.item_moderated.connect
+@events.items_moderated.connect
+@events.item_claimed.connect
+@events.item_reservation_changed.connect
+def _on_catalog_write(sender, **extra):
+    featured.mark_stale()
@@ -0,0 +1,195 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Uploaded images are stored once per distinct content, named by SHA-256:
+#   <root>/originals/ab/abcdef....
+#   <root>/variants/ab/abcdef.../320.jpg, 320.webp, ...
+# Since a name always refers to the same bytes, everything can be cached forever.
+
+IMAGE_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+VARIANT_RE = re.compile(r"^(?P<size>\d+)\.(?P<format>jpg|webp)$")
+VARIANT_FORMATS = {"jpg": ("JPEG", "image/jpeg"), "webp": ("WEBP", "image/webp")}
+
+# Leading bytes of the formats we accept
+SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+class InvalidImage(ValueError):
+    """Raised when an upload is not an accepted image or is too large"""
+
+def sniff_content_type(head):
+    """Content type from an image's first bytes, or None if it is not an accepted format"""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, content_type in SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return None
+
+def make_variants(original, variant_dir, sizes):
+    """Write a JPEG and a WebP bounded by each size; runs in a worker process"""
+    from PIL import Image, ImageOps
+
+    os.makedirs(variant_dir, exist_ok=True)
+    with Image.open(original) as source:
+        source = ImageOps.exif_transpose(source).convert("RGB")
+        for size in sizes:
+            image = source.copy()
+            image.thumbnail((size, size))
+            for extension, (pil_format, _) in VARIANT_FORMATS.items():
+                path = os.path.join(variant_dir, f"{size}.{extension}")
+                # Write aside and rename, so readers never see a partial file
+                fd, tmp = tempfile.mkstemp(dir=variant_dir)
+                with os.fdopen(fd, "wb") as out:
+                    if pil_format == "JPEG":
+                        image.save(out, pil_format, quality=82, optimize=True, progressive=True)
+                    else:
+                        image.save(out, pil_format, quality=80, method=4)
+                os.replace(tmp, path)
+
+class ImageStore:
+    """Content-addressed image storage on local disk, with variants made in a process pool.
+
+    Uploads are hashed while they stream to a temporary file; an upload
+    whose hash is already stored is dropped as a duplicate. Thumbnails are
+    never made on the request thread: they are queued to worker processes
+    after the upload is saved, and requested again if a variant is asked
+    for before it exists, unless making them already failed once.
+    """
+
+    def __init__(self, root, sizes, max_bytes, workers):
+        self.root = root
+        self.sizes = sizes
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self._pool = None
+        self._pool_pid = None
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        # Created on first use and again after fork, since pools don't survive fork
+        pid = os.getpid()
+        if self._pool is None or self._pool_pid != pid:
+            with self._lock:
+                if self._pool is None or self._pool_pid != pid:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                    self._pool_pid = pid
+        return self._pool
+
+    def original_path(self, image_id):
+        return os.path.join(self.root, "originals", image_id[:2], image_id)
+
+    def variant_dir(self, image_id):
+        return os.path.join(self.root, "variants", image_id[:2], image_id)
+
+    def variant_path(self, image_id, variant):
+        return os.path.join(self.variant_dir(image_id), variant)
+
+    def failed_path(self, image_id):
+        # Marks an original Pillow could not decode, so its variants are never retried
+        return os.path.join(self.variant_dir(image_id), "failed")
+
+    def variants_failed(self, image_id):
+        return os.path.exists(self.failed_path(image_id))
+
+    def save(self, stream):
+        """Store an uploaded image; returns (image_id, created)"""
+        incoming = os.path.join(self.root, "incoming")
+        os.makedirs(incoming, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=incoming)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                head = stream.read(64 * 1024)
+                if not sniff_content_type(head):
+                    raise InvalidImage("Unsupported image type")
+                chunk = head
+                while chunk:
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise InvalidImage(f"Image is larger than {self.max_bytes} bytes")
+                    digest.update(chunk)
+                    out.write(chunk)
+                    chunk = stream.read(64 * 1024)
+
+            image_id = digest.hexdigest()
+            path = self.original_path(image_id)
+            if os.path.exists(path):
+                return image_id, False
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp, path)
+            tmp = None
+        finally:
+            if tmp is not None:
+                os.unlink(tmp)
+
+        self.request_variants(image_id)
+        return image_id, True
+
+    def request_variants(self, image_id):
+        """Queue variant generation for an image, unless it is already queued or has failed before"""
+        if self.variants_failed(image_id):
+            return
+        with self._lock:
+            if image_id in self._pending:
+                return
+            self._pending.add(image_id)
+        if not self.workers:
+            # Inline mode for development and tests
+            error = None
+            try:
+                make_variants(self.original_path(image_id), self.variant_dir(image_id), self.sizes)
+            except Exception as e:
+                error = e
+            self._done(image_id, error=error)
+            return
+        try:
+            future = self._executor().submit(make_variants, self.original_path(image_id),
+                                             self.variant_dir(image_id), self.sizes)
+        except Exception as e:
+            # A broken pool (a worker was killed) refuses every later submit, so
+            # start a new one next time; the variant is requested again on its next GET
+            logger.warning("Could not queue variants for image %s: %s", image_id, e)
+            with self._lock:
+                self._pending.discard(image_id)
+                self._pool = None
+            return
+        future.add_done_callback(lambda f: self._done(image_id, f))
+
+    def _done(self, image_id, future=None, error=None):
+        if future is not None:
+            error = future.exception()
+        if error is not None:
+            logger.warning("Could not make variants for image %s: %s", image_id, error)
+            os.makedirs(self.variant_dir(image_id), exist_ok=True)
+            with open(self.failed_path(image_id), "w") as marker:
+                marker.write(f"{error}\n")
+        with self._lock:
+            self._pending.discard(image_id)
+
+def init_app(app):
+    """Attach an ImageStore configured from the app config"""
+    workers = app.config['IMAGE_WORKERS']
+    app.extensions['images'] = ImageStore(
+        root=app.config['IMAGE_STORAGE_DIR'],
+        sizes=app.config['IMAGE_VARIANT_SIZES'],
+        max_bytes=app.config['IMAGE_MAX_BYTES'],
+        workers=os.cpu_count() if workers is None else workers
+    )
+
+def image_store():
+    return current_app.extensions['images']
@@ -0,0 +1,15 @@
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+class BSONJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, also encoding ObjectId, so views can return documents as-is"""
+
+    # Key order is the document's; sorting every response's keys costs CPU for nothing
+    sort_keys = False
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, ObjectId):
+            return str(o)
+        # datetime, date, UUID, dataclasses: same encoding as before
+        return DefaultJSONProvider.default(o)
@@ -0,0 +1,197 @@
+import bisect
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from flask import Response, g, request
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# The blueprint endpoint handling the current request, so MongoDB commands
+# can be attributed to it. A ContextVar works for both threads and asyncio tasks.
+current_endpoint = ContextVar('current_endpoint', default='none')
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class Histogram:
+    """Prometheus-style histogram keyed by a fixed tuple of label values"""
+
+    def __init__(self, name, help, labels, buckets):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(k, list(v[0]), v[1], v[2]) for k, v in self._series.items()]
+        for label_values, counts, total, count in sorted(snapshot):
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, label_values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, label_values)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labels, label_values)} {count}")
+        return lines
+
+class Counter:
+    """Prometheus-style counter keyed by a fixed tuple of label values"""
+
+    def __init__(self, name, help, labels):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        for label_values, value in snapshot:
+            lines.append(f"{self.name}{_labels(self.labels, label_values)} {value}")
+        return lines
+
+http_request_seconds = Histogram(
+    "http_request_duration_seconds", "Time spent handling a request, by endpoint",
+    ("endpoint", "method", "status"), HTTP_BUCKETS)
+http_request_db_seconds = Histogram(
+    "http_request_db_seconds", "Time a request spent waiting on MongoDB",
+    ("endpoint",), HTTP_BUCKETS)
+mongodb_command_seconds = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency, by issuing endpoint",
+    ("endpoint", "command", "collection"), DB_BUCKETS)
+mongodb_documents_returned = Counter(
+    "mongodb_documents_returned_total", "Documents returned by find/getMore/aggregate",
+    ("endpoint", "command", "collection"))
+mongodb_command_failures = Counter(
+    "mongodb_command_failures_total", "MongoDB commands that failed",
+    ("endpoint", "command", "collection"))
+
+METRICS = [http_request_seconds, http_request_db_seconds, mongodb_command_seconds,
+           mongodb_documents_returned, mongodb_command_failures]
+
+# Per-request accumulator of MongoDB time; None outside a request
+_request_db_time = ContextVar('request_db_time', default=None)
+
+class CommandMetrics(monitoring.CommandListener):
+    """Records each MongoDB command's latency and size against the endpoint that issued it"""
+
+    def __init__(self, slow_threshold_ms):
+        self.slow_threshold = slow_threshold_ms / 1000
+        self._pending = {}
+
+    def started(self, event):
+        # started/succeeded are delivered on the thread (or task) that issued the command
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = event.command.get('collection', '')
+        self._pending[event.request_id] = (current_endpoint.get(), collection)
+
+    def succeeded(self, event):
+        endpoint, collection = self._pending.pop(event.request_id, (current_endpoint.get(), ''))
+        labels = (endpoint, event.command_name, collection)
+        seconds = event.duration_micros / 1e6
+        mongodb_command_seconds.observe(labels, seconds)
+        accumulator = _request_db_time.get()
+        if accumulator is not None:
+            accumulator[0] += seconds
+
+        cursor = event.reply.get('cursor') if isinstance(event.reply, dict) else None
+        if cursor:
+            batch = cursor.get('firstBatch', cursor.get('nextBatch'))
+            if batch is not None:
+                mongodb_documents_returned.inc(labels, len(batch))
+
+        if seconds >= self.slow_threshold:
+            logger.warning("Slow MongoDB %s on %s from %s: %.1f ms",
+                           event.command_name, collection, endpoint, seconds * 1000)
+
+    def failed(self, event):
+        endpoint, collection = self._pending.pop(event.request_id, (current_endpoint.get(), ''))
+        mongodb_command_failures.inc((endpoint, event.command_name, collection))
+
+_listener = None
+
+def begin_request(endpoint):
+    """Start timing a request and attribute MongoDB commands to `endpoint` until end_request"""
+    return (time.perf_counter(), current_endpoint.set(endpoint), _request_db_time.set([0.0]))
+
+def record_request_metrics(tracked, method, status):
+    """Observe the latency and MongoDB time of a request started with begin_request"""
+    start = tracked[0]
+    endpoint = current_endpoint.get()
+    http_request_seconds.observe((endpoint, method, str(status)), time.perf_counter() - start)
+    http_request_db_seconds.observe((endpoint,), _request_db_time.get()[0])
+
+def end_request(tracked):
+    current_endpoint.reset(tracked[1])
+    _request_db_time.reset(tracked[2])
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+def init_app(app):
+    """Time every request, instrument MongoDB commands and serve /metrics"""
+    global _listener
+    if not app.config['METRICS_ENABLED']:
+        return
+    # Listeners are process-wide and must be registered before the MongoClient
+    # is created (models/db.py creates it lazily); register only once per process
+    if _listener is None:
+        _listener = CommandMetrics(app.config['SLOW_QUERY_THRESHOLD_MS'])
+        monitoring.register(_listener)
+
+    @app.before_request
+    def start_timer():
+        g.metrics_request = begin_request(request.endpoint or 'unmatched')
+
+    @app.after_request
+    def record_request(response):
+        tracked = g.get('metrics_request')
+        if tracked is not None:
+            record_request_metrics(tracked, request.method, response.status_code)
+        return response
+
+    @app.teardown_request
+    def reset_context(exc):
+        tracked = g.pop('metrics_request', None)
+        if tracked is not None:
+            end_request(tracked)
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(render(), mimetype='text/plain; version=0.0.4')
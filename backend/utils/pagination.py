@@ -0,0 +1,82 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+
+# Newest first, with _id as a tie-breaker so the order is stable
+ITEM_SORT = [("created_at", -1), ("_id", -1)]
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue"""
+
+def encode_cursor(doc):
+    """Build an opaque cursor pointing just past the given document"""
+    created_at = doc.get('created_at')
+    payload = {
+        "t": created_at.isoformat() if created_at else None,
+        "id": str(doc['_id'])
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def encode_offset_cursor(offset):
+    """Opaque cursor for result sets that cannot be keyset-paginated (e.g. relevance order)"""
+    raw = json.dumps({"o": offset}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_offset_cursor(cursor):
+    """Turn an offset cursor back into a non-negative offset"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        offset = int(json.loads(base64.urlsafe_b64decode(padded.encode()))['o'])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor(cursor)
+    if offset < 0:
+        raise InvalidCursor(cursor)
+    return offset
+
+def decode_cursor(cursor):
+    """Turn an opaque cursor back into (created_at, ObjectId)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(payload['t']) if payload['t'] else None
+        return created_at, ObjectId(payload['id'])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise InvalidCursor(cursor)
+
+def after_cursor(cursor):
+    """Query fragment selecting documents that sort after the cursor"""
+    created_at, last_id = decode_cursor(cursor)
+    if created_at is None:
+        # Documents without created_at sort last, so only _id is left to compare
+        return {"created_at": None, "_id": {"$lt": last_id}}
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": last_id}},
+        {"created_at": None}
+    ]}
+
+def parse_limit(value, default, maximum):
+    """Parse a ?limit= value, clamping it to [1, maximum]"""
+    if value is None:
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    return max(1, min(limit, maximum))
+
+def page_query(query, cursor=None):
+    """Restrict query to the documents after cursor"""
+    if cursor:
+        return {"$and": [query, after_cursor(cursor)]}
+    return query
+
+def split_page(docs, limit):
+    """Trim a limit + 1 fetch to one page; returns (documents, next_cursor)"""
+    if len(docs) > limit:
+        docs = docs[:limit]
+        return docs, encode_cursor(docs[-1])
+    return docs, None
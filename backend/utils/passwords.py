@@ -0,0 +1,109 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+from models.user_model import users_collection
+
+class PasswordServiceBusy(Exception):
+    """Raised when every hashing slot is taken; callers should retry later"""
+
+class PasswordService:
+    """Password hashing off the request thread, in a bounded process pool.
+
+    Hashing is deliberately slow and CPU-bound; running it in worker
+    processes keeps it from holding the GIL that browse requests need.
+    At most `max_pending` hashes are queued or running at once; beyond
+    that, callers wait up to `queue_timeout` seconds and then get
+    PasswordServiceBusy instead of piling up.
+    """
+
+    def __init__(self, method, workers, max_pending, queue_timeout):
+        self.method = method
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        # Created on first use and again after fork, since pools don't survive fork
+        pid = os.getpid()
+        if self._pool is None or self._pool_pid != pid:
+            with self._lock:
+                if self._pool is None or self._pool_pid != pid:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                    self._pool_pid = pid
+        return self._pool
+
+    def _run(self, fn, *args, wait=True):
+        if not self.workers:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.queue_timeout if wait else 0):
+            raise PasswordServiceBusy()
+        try:
+            future = self._executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result() if wait else future
+
+    def hash(self, password):
+        """Hash a password with the configured method"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored_hash, password):
+        """Check a password against a stored hash"""
+        return self._run(check_password_hash, stored_hash, password)
+
+    def needs_rehash(self, stored_hash):
+        """True if the stored hash was made with a different method or cost"""
+        return stored_hash.split('$', 1)[0] != self.method
+
+    def upgrade(self, user_id, stored_hash, password):
+        """Re-hash a just-verified password with the current method, in the background"""
+        def save(new_hash):
+            # Only replace the hash we verified, in case the password changed meanwhile
+            users_collection.update_one({"_id": user_id, "password": stored_hash},
+                                        {"$set": {"password": new_hash}})
+
+        def saved(future):
+            if future.exception() is None:
+                save(future.result())
+
+        if not self.workers:
+            save(generate_password_hash(password, self.method))
+            return
+        try:
+            self._run(generate_password_hash, password, self.method, wait=False).add_done_callback(saved)
+        except PasswordServiceBusy:
+            # Not urgent: the next successful login will try again
+            pass
+
+def init_app(app):
+    """Attach a PasswordService configured from the app config"""
+    workers = app.config['PASSWORD_HASH_WORKERS']
+    app.extensions['passwords'] = PasswordService(
+        method=app.config['PASSWORD_HASH_METHOD'],
+        workers=os.cpu_count() if workers is None else workers,
+        max_pending=app.config['PASSWORD_HASH_MAX_PENDING'],
+        queue_timeout=app.config['PASSWORD_HASH_QUEUE_TIMEOUT']
+    )
+
+def _service():
+    return current_app.extensions['passwords']
+
+def hash_password(password):
+    """Hash a password with the app's configured method"""
+    return _service().hash(password)
+
+def verify_password(user, password):
+    """Check a user's password, upgrading the stored hash if its method is outdated"""
+    service = _service()
+    if not service.verify(user['password'], password):
+        return False
+    if service.needs_rehash(user['password']):
+        service.upgrade(user['_id'], user['password'], password)
+    return True
@@ -0,0 +1,208 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import request, session, g, jsonify
+
+# Per-route token buckets plus a cap on requests in flight, so a burst of
+# claims, posts or sign-ins gets fast 429/503 answers instead of tying up
+# every worker thread while browsing waits behind it.
+#
+# Limits come from RATE_LIMITS, e.g. "items.claim_item=10/minute": a bucket
+# of 10 tokens refilled at 10 per minute, one per request. Each limited
+# request takes a token from its client IP's bucket and, when signed in,
+# from the user's bucket too. Behind a reverse proxy, apply werkzeug's
+# ProxyFix so request.remote_addr is the client and not the proxy.
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+class RateLimitExceeded(Exception):
+    """A token bucket ran dry; retry_after is seconds until it has a token again"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Rate limit exceeded, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+def parse_limits(value):
+    """Parse "endpoint=count/period,..." into {endpoint: (capacity, tokens per second)}"""
+    limits = {}
+    for part in (value or "").split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            endpoint, rate = part.split('=')
+            count, period = rate.split('/')
+            capacity = int(count)
+            period = period.strip()
+            seconds = int(period) if period.isdigit() else PERIODS[period]
+        except (ValueError, KeyError):
+            raise ValueError(f"Invalid rate limit: {part!r} (expected endpoint=count/period)")
+        limits[endpoint.strip()] = (capacity, capacity / seconds)
+    return limits
+
+class MemoryStore:
+    """Token buckets for this process: key -> [tokens, last refill], oldest keys evicted first"""
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate):
+        """Take one token; returns 0 if allowed, else seconds until a token is due"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                # An evicted bucket had been idle the longest, so it would be full anyway
+                bucket = self.buckets[key] = [float(capacity), now]
+                while len(self.buckets) > self.max_keys:
+                    self.buckets.popitem(last=False)
+            else:
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+                self.buckets.move_to_end(key)
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / rate
+
+    def stats(self):
+        return {"keys": len(self.buckets), "max_keys": self.max_keys}
+
+class KeyValueStore:
+    """Buckets shared between workers over a Redis-style client (incr/expire), e.g. redis-py or a local stand-in.
+
+    Plain incr can't refill a bucket atomically, so each bucket becomes a
+    fixed window of `capacity` requests per capacity / rate seconds: the
+    same average rate, with bursts of up to twice the capacity at a window
+    edge.
+    """
+
+    def __init__(self, client, prefix="necessities:ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+
+    def take(self, key, capacity, rate):
+        window = max(1, int(round(capacity / rate)))
+        now = time.time()
+        slot = int(now // window)
+        counter = f"{self.prefix}{key}:{slot}"
+        count = self.client.incr(counter)
+        if count == 1:
+            self.client.expire(counter, window + 1)
+        if count <= capacity:
+            return 0
+        return (slot + 1) * window - now
+
+    def stats(self):
+        return {"backend": "shared"}
+
+def make_store(config):
+    """Build the store named by RATE_LIMIT_BACKEND"""
+    if config['RATE_LIMIT_BACKEND'] == "redis":
+        # Optional dependency, only needed when limits are shared between workers
+        import redis
+        return KeyValueStore(redis.Redis.from_url(config['RATE_LIMIT_URL']))
+    return MemoryStore(config['RATE_LIMIT_MAX_KEYS'])
+
+class ConcurrencyLimiter:
+    """At most `limit` requests in flight; over the limit, fail at once rather than queue"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self.limit and self.in_flight >= self.limit:
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self):
+        return {"in_flight": self.in_flight, "limit": self.limit, "rejected": self.rejected}
+
+class RateLimiter:
+    """Route token buckets and concurrency caps, wired in by init_app"""
+
+    def __init__(self, store, limits, max_concurrent, max_concurrent_limited):
+        self.store = store
+        self.limits = limits
+        self.requests = ConcurrencyLimiter(max_concurrent)
+        # The limited routes (writes, sign-ins) get a smaller share of the threads
+        self.limited_requests = ConcurrencyLimiter(max_concurrent_limited)
+        self.throttled = 0
+
+    def clients(self):
+        """Bucket keys for the current request: its IP and, when signed in, its user"""
+        keys = ["ip:" + (request.remote_addr or "unknown")]
+        user_id = session.get('user_id') or session.get('admin')
+        if user_id:
+            keys.append("user:" + str(user_id))
+        return keys
+
+    def check(self, endpoint):
+        """Take a token from every bucket for this request; raise RateLimitExceeded if any is empty"""
+        capacity, rate = self.limits[endpoint]
+        retry_after = max(self.store.take(f"{endpoint}:{client}", capacity, rate)
+                          for client in self.clients())
+        if retry_after:
+            self.throttled += 1
+            raise RateLimitExceeded(retry_after)
+
+    def stats(self):
+        return {
+            "requests": self.requests.stats(),
+            "limited_requests": self.limited_requests.stats(),
+            "throttled": self.throttled,
+            "store": self.store.stats()
+        }
+
+def _rejection(status, message, retry_after):
+    response = jsonify({"status": "error", "message": message})
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response, status
+
+def init_app(app):
+    """Check limits before each request and release concurrency slots after it"""
+    if not app.config['RATE_LIMIT_ENABLED']:
+        return
+    limiter = RateLimiter(make_store(app.config), parse_limits(app.config['RATE_LIMITS']),
+                          app.config['RATE_LIMIT_MAX_CONCURRENT'],
+                          app.config['RATE_LIMIT_MAX_CONCURRENT_LIMITED'])
+    app.extensions['rate_limiter'] = limiter
+
+    @app.before_request
+    def limit_request():
+        # CORS preflights do no work and come before every cross-origin write;
+        # throttling them would block the real request they precede
+        if request.method == 'OPTIONS':
+            return None
+        if not limiter.requests.acquire():
+            return _rejection(503, "Server busy, please try again", 1)
+        g.rate_limit_slots = [limiter.requests]
+        if request.endpoint not in limiter.limits:
+            return None
+        try:
+            limiter.check(request.endpoint)
+        except RateLimitExceeded as e:
+            return _rejection(429, "Too many requests, please slow down", e.retry_after)
+        if not limiter.limited_requests.acquire():
+            return _rejection(503, "Too many requests like this right now, please try again", 1)
+        g.rate_limit_slots.append(limiter.limited_requests)
+        return None
+
+    @app.teardown_request
+    def release_slots(exc):
+        # Streamed bodies (SSE, admin exports) have left the view by now, so they hold no slot
+        for limiter_slots in g.pop('rate_limit_slots', ()):
+            limiter_slots.release()
@@ -0,0 +1,101 @@
+import json
+from config import Config
+from utils.cache import LRUCache
+
+# Read-through cache for GET /api/items pages, keyed by query shape.
+#
+# Keys embed the listing's generation from the catalog document the
+# response's ETag is made from (see utils/catalog.py), so a cached page always
+# matches its ETag: a write that changes a category's listing moves that
+# category's generation, and from then on its old pages are never read again
+# and age out of the LRU or expire by TTL. Other categories keep their pages.
+# Workers pick up a generation moved by another worker within
+# CATALOG_VERSION_MAX_AGE. Use the key-value backend to share one cache
+# between workers.
+
+ALL = "*"
+
+class MemoryBackend:
+    """In-process LRU backend (the default)"""
+
+    blocking = False
+
+    def __init__(self, max_entries, ttl):
+        self.entries = LRUCache(maxsize=max_entries, ttl=ttl)
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, value):
+        self.entries.set(key, value)
+
+    def stats(self):
+        return self.entries.stats()
+
+class KeyValueBackend:
+    """Backend over a Redis-style client (get/set(ex=)), e.g. redis-py or a local stand-in"""
+
+    # Network round trips: async callers run these off the event loop
+    blocking = True
+
+    def __init__(self, client, ttl, prefix="necessities:items:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+def make_backend(config=Config):
+    """Build the backend named by RESPONSE_CACHE_BACKEND"""
+    if config.RESPONSE_CACHE_BACKEND == "redis":
+        # Optional dependency, only needed when a shared cache is configured
+        import redis
+        return KeyValueBackend(redis.Redis.from_url(config.RESPONSE_CACHE_URL),
+                               ttl=config.RESPONSE_CACHE_TTL)
+    return MemoryBackend(config.RESPONSE_CACHE_MAX_ENTRIES, config.RESPONSE_CACHE_TTL)
+
+class ListingCache:
+    """Cached GET /api/items pages, keyed on their listing's generation"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def key(self, generation, category, cursor, limit, fields=None, embed=()):
+        """Cache key for one page of one listing under one generation (catalog.listing_generation)"""
+        return json.dumps([generation, category or ALL, cursor, limit, fields, list(embed)],
+                          separators=(',', ':'))
+
+    def get(self, key):
+        """(body, next_cursor) for a cached page, or None"""
+        value = self.backend.get(key)
+        if value is None:
+            return None
+        page = json.loads(value)
+        return page["body"], page["next"]
+
+    def set(self, key, body, next_cursor):
+        self.backend.set(key, json.dumps({"body": body, "next": next_cursor}))
+
+    def stats(self):
+        return self.backend.stats()
+
+listing_cache = ListingCache(make_backend())
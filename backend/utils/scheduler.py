@@ -0,0 +1,108 @@
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from models.db import collection
+
+logger = logging.getLogger(__name__)
+
+job_runs_collection = collection('job_runs')
+job_locks_collection = collection('job_locks')
+
+class Job:
+    """A function run every `interval` seconds; it returns a dict of document counts"""
+
+    def __init__(self, name, interval, fn):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self.next_run = 0.0
+
+def acquire_lease(name, seconds, owner):
+    """Take the job's lease unless another live process holds it"""
+    now = datetime.utcnow()
+    try:
+        job_locks_collection.find_one_and_update(
+            {"_id": name, "$or": [{"locked_until": {"$lte": now}}, {"owner": owner}]},
+            {"$set": {"locked_until": now + timedelta(seconds=seconds), "owner": owner}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        # The upsert collided with a lock someone else still holds
+        return False
+
+def release_lease(name, owner):
+    job_locks_collection.update_one({"_id": name, "owner": owner},
+                                    {"$set": {"locked_until": datetime.utcnow()}})
+
+class Scheduler:
+    """Runs jobs on their intervals inside the app context, one process at a time per job.
+
+    Every process may run a Scheduler (a `python worker.py` process, or the
+    web workers with SCHEDULER_IN_PROCESS); a lease in `job_locks` makes
+    sure each job runs in only one of them at once. Each run is recorded
+    in `job_runs` with its duration and counts.
+    """
+
+    def __init__(self, app, jobs, lease_seconds=600):
+        self.app = app
+        self.jobs = jobs
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+
+    def run_job(self, job):
+        """Run one job now if its lease is free; returns the recorded run or None"""
+        if not acquire_lease(job.name, self.lease_seconds, self.owner):
+            return None
+        started = datetime.utcnow()
+        start = time.perf_counter()
+        run = {"job": job.name, "started_at": started, "owner": self.owner}
+        try:
+            with self.app.app_context():
+                run["counts"] = job.fn(self.app) or {}
+        except Exception as e:
+            logger.exception("Job %s failed", job.name)
+            run["error"] = str(e)
+        finally:
+            release_lease(job.name, self.owner)
+        run["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        try:
+            job_runs_collection.insert_one(run)
+        except PyMongoError as e:
+            logger.error("Could not record run of %s: %s", job.name, e)
+        logger.info("Job %s took %.1f ms: %s", job.name, run["duration_ms"], run.get("counts", run.get("error")))
+        return run
+
+    def run_pending(self):
+        """Run every job whose interval has elapsed"""
+        now = time.monotonic()
+        for job in self.jobs:
+            if job.next_run <= now:
+                job.next_run = now + job.interval
+                self.run_job(job)
+
+    def run_forever(self, tick=1.0):
+        while not self._stop.is_set():
+            try:
+                self.run_pending()
+            except PyMongoError as e:
+                # Lost the database for a moment; try again on the next tick
+                logger.error("Scheduler tick failed: %s", e)
+            self._stop.wait(tick)
+
+    def start(self):
+        """Run in a daemon thread of this process"""
+        threading.Thread(target=self.run_forever, name="scheduler", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+def recent_runs(limit=50, job=None):
+    """The latest recorded job runs, newest first"""
+    query = {"job": job} if job else {}
+    return list(job_runs_collection.find(query).sort("started_at", -1).limit(limit))
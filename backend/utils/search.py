@@ -0,0 +1,101 @@
+import re
+from collections import defaultdict
+
+# Text index over the searchable item fields; title matches count ten times as much
+TEXT_INDEX_KEYS = [("title", "text"), ("description", "text")]
+TEXT_INDEX_WEIGHTS = {"title": 10, "description": 1}
+TEXT_INDEX_NAME = "item_text"
+
+# Upper bound on how deep a search can page, since relevance order cannot use keysets
+MAX_SEARCH_RESULTS = 1000
+
+STOPWORDS = {"a", "an", "and", "are", "as", "at", "be", "for", "from", "in",
+             "is", "it", "of", "on", "or", "the", "to", "with"}
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text):
+    """Lowercase words in text, minus stopwords"""
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+class InvertedIndex:
+    """In-memory term -> {doc_id: weighted frequency} index for the $text fallback"""
+
+    def __init__(self, weights=TEXT_INDEX_WEIGHTS):
+        self.weights = weights
+        self.postings = defaultdict(dict)
+        self.docs = {}
+
+    def add(self, doc):
+        """Index one document by its weighted text fields"""
+        doc_id = doc['_id']
+        self.docs[doc_id] = doc
+        for field, weight in self.weights.items():
+            for term in tokenize(doc.get(field)):
+                postings = self.postings[term]
+                postings[doc_id] = postings.get(doc_id, 0) + weight
+
+    def _rank_key(self, doc_id, score):
+        created_at = self.docs[doc_id].get('created_at')
+        return (score, created_at is not None, created_at)
+
+    def search(self, text):
+        """Documents matching any term of text, best score first"""
+        scores = defaultdict(float)
+        for term in set(tokenize(text)):
+            for doc_id, weight in self.postings.get(term, {}).items():
+                scores[doc_id] += weight
+        ranked = sorted(scores.items(),
+                        key=lambda kv: self._rank_key(*kv),
+                        reverse=True)
+        return [(self.docs[doc_id], score) for doc_id, score in ranked]
+
+TEXT_SCORE_PROJECTION = {"score": {"$meta": "textScore"}}
+TEXT_SCORE_SORT = [("score", {"$meta": "textScore"}), ("created_at", -1)]
+
+def text_query(query, text):
+    """query narrowed to documents matching the $text search"""
+    return dict(query, **{"$text": {"$search": text}})
+
+def rank_documents(docs, text, skip, limit):
+    """Rank candidate documents for text in Python, for servers without $text"""
+    index = InvertedIndex()
+    for doc in docs:
+        index.add(doc)
+    results = []
+    for doc, score in index.search(text)[skip:skip + limit]:
+        doc['score'] = score
+        results.append(doc)
+    return results
+
+# What the Python fallback reads to rank a document
+RANKING_FIELDS = ("title", "description", "created_at")
+
+def score_projection(projection):
+    """projection plus the $text score"""
+    return {**projection, **TEXT_SCORE_PROJECTION} if projection else TEXT_SCORE_PROJECTION
+
+def ranking_projection(projection):
+    """projection plus the fields the Python fallback ranks by"""
+    return {**projection, **{field: 1 for field in RANKING_FIELDS}} if projection else None
+
+def trim_ranked(docs, projection):
+    """Drop the ranking-only fields from fallback results again"""
+    if projection:
+        keep = set(projection) | {"_id", "score"}
+        for doc in docs:
+            for field in [f for f in doc if f not in keep]:
+                del doc[field]
+    return docs
+
+def search_items(collection, text, query, skip=0, limit=20, projection=None):
+    """Relevance-ranked search within query, using $text when the server supports it"""
+    try:
+        cursor = collection.find(text_query(query, text), score_projection(projection))
+        return list(cursor.sort(TEXT_SCORE_SORT).skip(skip).limit(limit))
+    except NotImplementedError:
+        # A stand-in without $text support (mongomock): rank in Python instead. On a
+        # real server a missing text index raises OperationFailure and is not hidden
+        # behind a full scan; `flask check-indexes` reports it.
+        docs = collection.find(query, ranking_projection(projection))
+        return trim_ranked(rank_documents(docs, text, skip, limit), projection)
@@ -0,0 +1,42 @@
+from flask import Response, current_app, request
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl')
+
+def wants_ndjson():
+    """True if the client's Accept header prefers NDJSON over a JSON array"""
+    best = request.accept_mimetypes.best_match(('application/json',) + NDJSON_MIMETYPES)
+    return best in NDJSON_MIMETYPES
+
+def parse_batch_size(value, default, maximum):
+    """Parse a ?batch_size= value, clamping it to [1, maximum]"""
+    if value is None:
+        return default
+    try:
+        return max(1, min(int(value), maximum))
+    except ValueError:
+        raise ValueError("batch_size must be an integer")
+
+def _encoded(cursor, dumps):
+    for doc in cursor:
+        yield dumps(doc)
+
+def _ndjson(cursor, dumps):
+    for line in _encoded(cursor, dumps):
+        yield line + '\n'
+
+def _json_array(cursor, dumps):
+    # Same body jsonify(list(...)) would produce, one document per chunk
+    yield '['
+    first = True
+    for doc in _encoded(cursor, dumps):
+        yield doc if first else ',' + doc
+        first = False
+    yield ']\n'
+
+def stream_cursor(cursor):
+    """Stream a cursor as NDJSON or a JSON array (per Accept), one document at a time"""
+    # Capture the app's encoder now; the generator runs after the view returns
+    dumps = current_app.json.dumps
+    if wants_ndjson():
+        return Response(_ndjson(cursor, dumps), mimetype='application/x-ndjson')
+    return Response(_json_array(cursor, dumps), mimetype='application/json')
@@ -0,0 +1,23 @@
+import argparse
+import logging
+from app import create_app
+from models.lifecycle_model import lifecycle_jobs
+from utils.scheduler import Scheduler
+
+# Background jobs (expiring, archiving, tidying holds) in their own process:
+#     python worker.py          run on the configured intervals
+#     python worker.py --once   run every job once and exit (e.g. from cron)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the item lifecycle jobs")
+    parser.add_argument('--once', action='store_true', help="run every job once and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    app = create_app()
+    scheduler = Scheduler(app, lifecycle_jobs(app.config))
+    if args.once:
+        for job in scheduler.jobs:
+            scheduler.run_job(job)
+    else:
+        scheduler.run_forever()
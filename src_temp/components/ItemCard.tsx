@@ -2,6 +2,7 @@ import { Link } from "react-router-dom"
 import { Card, CardContent, CardFooter, CardHeader } from "@/components/ui/card"
 import { Badge } from "@/components/ui/badge"
 import { Calendar } from "lucide-react"
+import { imageVariantUrl } from "../utils/api"
 
 interface ItemCardProps {
   item: {
@@ -10,6 +11,7 @@ interface ItemCardProps {
     description: string
     category: string
     image_url?: string
+    image_id?: string
     created_at: string
     status: string
   }
@@ -35,7 +37,11 @@ const ItemCard = ({ item }: ItemCardProps) => {
       <Link to={`/items/${item._id}`} className="flex-grow flex flex-col">
         <div className="aspect-square w-full overflow-hidden">
           <img
-            src={item.image_url || `/placeholder.svg?height=300&width=300&query=item ${item.category}`}
+            src={
+              item.image_id
+                ? imageVariantUrl(item.image_id)
+                : item.image_url || `/placeholder.svg?height=300&width=300&query=item ${item.category}`
+            }
             alt={item.title}
             className="w-full h-full object-cover"
           />
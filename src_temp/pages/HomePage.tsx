@@ -14,9 +14,9 @@ const HomePage = () => {
   useEffect(() => {
     const fetchFeaturedItems = async () => {
       try {
-        const response = await itemsApi.getAll()
-        // Get the most recent 4 items
-        setFeaturedItems(response.data.slice(0, 4))
+        // Four recent, available items across categories
+        const response = await itemsApi.featured(4)
+        setFeaturedItems(response.data)
       } catch (error) {
         console.error("Error fetching featured items:", error)
       } finally {
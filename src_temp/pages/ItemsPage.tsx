@@ -4,7 +4,7 @@ import type React from "react"
 
 import { useState, useEffect } from "react"
 import { useSearchParams } from "react-router-dom"
-import { itemsApi } from "../utils/api"
+import { itemsApi, nextCursor } from "../utils/api"
 import ItemCard from "../components/ItemCard"
 import { Input } from "@/components/ui/input"
 import { Button } from "@/components/ui/button"
@@ -25,18 +25,27 @@ const categories = [
 
 const ItemsPage = () => {
   const [searchParams, setSearchParams] = useSearchParams()
-  const [items, setItems] = useState([])
+  const [items, setItems] = useState<any[]>([])
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
+  const [cursor, setCursor] = useState<string | null>(null)
   const [searchTerm, setSearchTerm] = useState("")
+  const [activeSearch, setActiveSearch] = useState("")
   const [selectedCategory, setSelectedCategory] = useState(searchParams.get("category") || "All")
 
+  const category = selectedCategory !== "All" ? selectedCategory.toLowerCase() : undefined
+
+  // The listing is paged; a search runs on the server so it covers every item, not just loaded ones
+  const fetchPage = (pageCursor?: string) =>
+    activeSearch ? itemsApi.search(activeSearch, category, pageCursor) : itemsApi.getAll(category, pageCursor)
+
   useEffect(() => {
     const fetchItems = async () => {
       setLoading(true)
       try {
-        const category = selectedCategory !== "All" ? selectedCategory.toLowerCase() : undefined
-        const response = await itemsApi.getAll(category)
+        const response = await fetchPage()
         setItems(response.data)
+        setCursor(nextCursor(response))
       } catch (error) {
         console.error("Error fetching items:", error)
       } finally {
@@ -45,7 +54,21 @@ const ItemsPage = () => {
     }
 
     fetchItems()
-  }, [selectedCategory])
+  }, [selectedCategory, activeSearch])
+
+  const loadMore = async () => {
+    if (!cursor) return
+    setLoadingMore(true)
+    try {
+      const response = await fetchPage(cursor)
+      setItems((loaded) => [...loaded, ...response.data])
+      setCursor(nextCursor(response))
+    } catch (error) {
+      console.error("Error fetching items:", error)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
 
   const handleCategoryChange = (category: string) => {
     setSelectedCategory(category)
@@ -59,16 +82,9 @@ const ItemsPage = () => {
 
   const handleSearch = (e: React.FormEvent) => {
     e.preventDefault()
-    // Filter items client-side for simplicity
-    // In a real app, you might want to implement server-side search
+    setActiveSearch(searchTerm.trim())
   }
 
-  const filteredItems = items.filter(
-    (item: any) =>
-      item.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      item.description.toLowerCase().includes(searchTerm.toLowerCase()),
-  )
-
   return (
     <div>
       <h1 className="text-3xl font-bold mb-6">Browse Items</h1>
@@ -108,21 +124,31 @@ const ItemsPage = () => {
       {/* Items Grid */}
       {loading ? (
         <div className="text-center py-12">Loading items...</div>
-      ) : filteredItems.length > 0 ? (
-        <div className="grid grid-cols-1 sm:grid-cols-2 md:grid-cols-3 lg:grid-cols-4 gap-6">
-          {filteredItems.map((item: any) => (
-            <ItemCard key={item._id} item={item} />
-          ))}
+      ) : items.length > 0 ? (
+        <div>
+          <div className="grid grid-cols-1 sm:grid-cols-2 md:grid-cols-3 lg:grid-cols-4 gap-6">
+            {items.map((item: any) => (
+              <ItemCard key={item._id} item={item} />
+            ))}
+          </div>
+          {cursor && (
+            <div className="text-center mt-8">
+              <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+                {loadingMore ? "Loading..." : "Load more"}
+              </Button>
+            </div>
+          )}
         </div>
       ) : (
         <div className="text-center py-12 bg-gray-50 rounded-lg">
           <p className="text-gray-600">No items found matching your criteria.</p>
-          {(searchTerm || selectedCategory !== "All") && (
+          {(activeSearch || selectedCategory !== "All") && (
             <Button
               variant="outline"
               className="mt-4 bg-transparent"
               onClick={() => {
                 setSearchTerm("")
+                setActiveSearch("")
                 handleCategoryChange("All")
               }}
             >
@@ -28,13 +28,31 @@ api.interceptors.response.use(
   },
 )
 
+// Resized copy of an uploaded image; the backend makes 320 and 960 px variants as JPEG and WebP
+export const imageVariantUrl = (imageId: string, variant = "320.webp") =>
+  `${api.defaults.baseURL}/images/${imageId}/${variant}`
+
 // Item-related API calls
 export const itemsApi = {
-  getAll: (category?: string) => {
-    const params = category ? { category } : {}
+  // One page of items; the next page's cursor comes back in the X-Next-Cursor header
+  getAll: (category?: string, cursor?: string, limit?: number) => {
+    const params: Record<string, string | number> = {}
+    if (category) params.category = category
+    if (cursor) params.cursor = cursor
+    if (limit) params.limit = limit
     return api.get("/items", { params })
   },
 
+  search: (q: string, category?: string, cursor?: string) => {
+    const params: Record<string, string> = { q }
+    if (category) params.category = category
+    if (cursor) params.cursor = cursor
+    return api.get("/items/search", { params })
+  },
+
+  // A few recent, available items across categories, precomputed by the backend
+  featured: (limit?: number) => api.get("/items/featured", { params: limit ? { limit } : {} }),
+
   getById: (id: string) => api.get(`/items/${id}`),
 
   create: (itemData: any) => api.post("/items", itemData),
@@ -44,6 +62,10 @@ export const itemsApi = {
   getMyItems: () => api.get("/items/my-items"),
 }
 
+// Cursor for the page after this response, if there is one
+export const nextCursor = (response: { headers: Record<string, any> }): string | null =>
+  response.headers["x-next-cursor"] || null
+
 // User-related API calls
 export const usersApi = {
   login: (email: string, password: string) => api.post("/users/login", { email, password }),